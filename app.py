@@ -1,101 +1,530 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Blueprint, Flask, current_app, request, jsonify, render_template, make_response, Response, stream_with_context
+from functools import wraps
 from werkzeug.utils import secure_filename
-from models import db, PowerBIModel
+from utils.database import db, configure_sqlite, database_uri, enable_pgvector, engine_options
 from utils.data_processor import DataProcessor
 from utils.lineage_view import LineageView
 from utils.powerbi_parser import PowerBIParser
+from utils.impact_analysis import ImpactAnalyzer
+from utils.search_index import SearchIndex
+from utils.dax_analyzer import DaxHotspotAnalyzer
+from utils.report_audit import ReportAuditor, DEFAULT_BUDGETS
+from utils.memory_advisor import MemoryAdvisor
+from utils.relationship_analyzer import RelationshipAnalyzer
+from utils.dax_similarity import DaxSimilarityIndex, DEFAULT_THRESHOLD
+from utils.jobs import JobRunner
+from utils.model_schema import decode_model
+from utils import analysis_cache, exporters, http_cache, model_store
+import json
 import os
 
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+bp = Blueprint('main', __name__)
 
-# Initialize database
-db.init_app(app)
+def job_runner():
+    return current_app.extensions['jobs']
 
-# Create tables
-with app.app_context():
-    db.create_all()
+def dax_index():
+    return current_app.extensions['dax_index']
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'tsv', 'json', 'bim'}
 
-@app.route('/')
+def decoded_model(model, model_data=None):
+    """The stored model decoded into schema records, once per content hash
+    and shared by every analysis of it. ``model_data`` is already parsed
+    JSON for the row, when the caller has it."""
+    return analysis_cache.get_or_build(
+        ('decoded-model', model.content_hash),
+        lambda: decode_model(model.content if model_data is None else model_data)
+    )
+
+def get_model_analysis(name, build):
+    """Returns the cached ``build(model, report_content)`` result for the
+    latest decoded model and report, or None if no model has been uploaded"""
+    model = model_store.latest('model')
+    if not model:
+        return None
+    report = model_store.latest('report')
+    report_content = report.content if report else None
+    key = (name, model.content_hash, report.content_hash if report else None)
+    return analysis_cache.get_or_build(key, lambda: build(decoded_model(model), report_content))
+
+def build_impact_analyzer(model, report_content):
+    analyzer = ImpactAnalyzer()
+    analyzer.process(model, report_content)
+    return analyzer
+
+def build_search_index(model, report_content):
+    index = SearchIndex()
+    index.build(model, report_content)
+    return index
+
+def conditional(*kinds):
+    """Answers If-None-Match with 304 before the view runs any analysis.
+
+    The ETag combines the content hashes of the latest files of ``kinds``,
+    the template and static versions and the request URL.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            files = [model_store.latest(kind) for kind in kinds]
+            etag = http_cache.make_etag(
+                [current_app.config['TEMPLATE_VERSION'], current_app.config['STATIC_VERSION'], request.full_path]
+                + [f.content_hash if f else None for f in files]
+            )
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag, weak=True)
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+@bp.app_url_defaults
+def add_static_version(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        version = http_cache.static_version(current_app.static_folder, values['filename'])
+        if version:
+            values.setdefault('v', version)
+
+@bp.after_app_request
+def cache_static(response):
+    if request.endpoint == 'static':
+        return http_cache.cache_static_response(
+            response, current_app.static_folder, request.view_args['filename'], request.args.get('v')
+        )
+    return response
+
+@bp.after_app_request
+def compress(response):
+    return http_cache.compress_response(response, request.accept_encodings)
+
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/upload', methods=['POST'])
+def build_dax_hotspots(model, report_content):
+    analyzer = DaxHotspotAnalyzer()
+    analyzer.process_model_data(model)
+    return analyzer
+
+def build_memory_advisor(model, report_content):
+    advisor = MemoryAdvisor()
+    advisor.process(model, report_content)
+    return advisor
+
+def build_relationship_analysis(model, report_content):
+    analyzer = RelationshipAnalyzer()
+    analyzer.process_model_data(model)
+    return analyzer.analyze()
+
+def sync_dax_index():
+    """Brings the DAX index in line with the stored models: indexes rows it
+    has not seen (uploaded by another worker, or before a restart) and drops
+    rows that were replaced. Only new rows are loaded and processed."""
+    index = dax_index()
+    stored = set(model_store.model_ids('model'))
+    for model_id in set(index.models) - stored:
+        index.remove_model(model_id)
+    for model_id in stored - set(index.models):
+        model = model_store.get(model_id)
+        if model:
+            index.add_model(model.id, model.name, model.content)
+    return index
+
+def get_report_audit():
+    """Audits the latest report against the configured budgets, which
+    individual requests may override with query parameters"""
+    report = model_store.latest('report')
+    if not report:
+        return None, {}
+    budgets = dict(DEFAULT_BUDGETS)
+    budgets.update(current_app.config['REPORT_AUDIT_BUDGETS'])
+    for name in budgets:
+        budgets[name] = request.args.get(name, budgets[name], type=int)
+    model = model_store.latest('model')
+    key = ('report-audit', report.content_hash, model.content_hash if model else None,
+           tuple(sorted(budgets.items())))
+
+    def build():
+        auditor = ReportAuditor(budgets, decoded_model(model) if model else None)
+        return auditor.audit(report.content)
+
+    return analysis_cache.get_or_build(key, build), budgets
+
+def process_upload(progress, app, filename, content):
+    """Background job: classifies and stores an uploaded file, and warms the
+    analyses that use it"""
+    with app.app_context():
+        progress(10, 'Reading file')
+        kind, data = model_store.classify(content)
+        progress(20, 'Storing file')
+        # Replace only an earlier upload of the same file, so other models
+        # stay available for cross-model analysis
+        model, replaced = model_store.replace(filename, content, kind)
+        for old_id in replaced:
+            dax_index().remove_model(old_id)
+
+        # A model is decoded from the JSON parsed above, once; the analyses
+        # below reuse it, and the parsed dict tree is freed here
+        decoded = decoded_model(model, data) if kind == 'model' else None
+        del data
+        if kind == 'model':
+            progress(40, 'Indexing DAX for duplicate detection')
+            dax_index().add_model(model.id, model.name, decoded)
+
+        if kind in ('model', 'report') and model_store.latest('model'):
+            progress(50, 'Building impact analysis')
+            get_model_analysis('impact', build_impact_analyzer)
+            progress(70, 'Building search index')
+            get_model_analysis('search', build_search_index)
+            progress(80, 'Scoring DAX hotspots')
+            get_model_analysis('dax-hotspots', build_dax_hotspots)
+            progress(90, 'Finding unreferenced columns')
+            get_model_analysis('memory', build_memory_advisor)
+        return {'model_id': model.id, 'kind': kind}
+
+@bp.route('/upload', methods=['POST'])
 def upload_file():
     try:
         file = request.files['file']
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
             content = file.read().decode('utf-8')
-            
-            # Delete old records
-            PowerBIModel.query.delete()
-            db.session.commit()
-            
-            # Store new file
-            model = PowerBIModel(
-                name=filename,
-                content=content
+            # Parsing happens in the job, so large files do not hold up the request
+            job = job_runner().submit(
+                'upload', process_upload, current_app._get_current_object(), filename, content, model=filename
             )
-            db.session.add(model)
-            db.session.commit()
-            
-            return jsonify({'success': True, 'message': 'File uploaded successfully'})
+            return jsonify({
+                'success': True,
+                'message': 'File uploaded, processing started',
+                'job_id': job['id'],
+                'status_url': f"/jobs/{job['id']}",
+                'events_url': f"/jobs/{job['id']}/events"
+            }), 202
         return jsonify({'error': 'Invalid file type'})
     except Exception as e:
         return jsonify({'error': str(e)})
 
-@app.route('/table-view')
+@bp.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_runner().get(job_id)
+    if not job:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+@bp.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Streams job progress as server-sent events until the job finishes"""
+    if not job_runner().get(job_id):
+        return jsonify({'error': 'Unknown job'}), 404
+
+    def stream():
+        for job in job_runner().watch(job_id):
+            yield f"data: {json.dumps(job)}\n\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/models/<name>/jobs')
+def model_jobs(name):
+    return jsonify(job_runner().for_model(secure_filename(name)))
+
+@bp.route('/table-view')
+@conditional('report')
 def table_view():
-    # Get latest uploaded file data from database
-    model = PowerBIModel.query.order_by(PowerBIModel.created_at.desc()).first()
+    # Get latest uploaded report from database
+    model = model_store.latest('report')
     if model:
         processor = DataProcessor()
         processor.process_json(model.content)
         return render_template('table_view.html', table_data=processor.visuals_data)
     return render_template('table_view.html', table_data=[])
 
-@app.route('/lineage-view')
+@bp.route('/lineage-view')
+@conditional('model')
 def lineage_view():
-    model = PowerBIModel.query.order_by(PowerBIModel.created_at.desc()).first()
+    model = model_store.latest('model')
     if model:
         lineage = LineageView()
-        lineage.process_model_data(model.content)
+        lineage.process_model_data(decoded_model(model))
         return render_template('lineage_view.html', nodes=lineage.nodes, edges=lineage.edges)
     return render_template('lineage_view.html', nodes=[], edges=[])
 
-@app.route('/dax-expressions')
+@bp.route('/dax-expressions')
+@conditional('model')
 def dax_expressions():
-    model = PowerBIModel.query.order_by(PowerBIModel.created_at.desc()).first()
+    model = model_store.latest('model')
     if model:
         lineage = LineageView()
-        lineage.process_model_data(model.content)
+        lineage.process_model_data(decoded_model(model))
         expressions = lineage.extract_dax_expressions()
         return render_template('dax_expressions.html', expressions=expressions)
     return render_template('dax_expressions.html', expressions=[])
 
-@app.route('/source-explorer')
+@bp.route('/source-explorer')
+@conditional('model')
 def source_explorer():
-    model = PowerBIModel.query.order_by(PowerBIModel.created_at.desc()).first()
+    model = model_store.latest('model')
     if model:
         parser = PowerBIParser()
-        m_queries = parser.extract_m_queries(model.content)
+        m_queries = parser.extract_m_queries(decoded_model(model))
         return render_template('source_explorer.html', queries=m_queries)
     return render_template('source_explorer.html', queries=[])
 
-@app.route('/unused-measures')
+@bp.route('/unused-measures')
+@conditional('model')
 def unused_measures():
-    model = PowerBIModel.query.order_by(PowerBIModel.created_at.desc()).first()
+    model = model_store.latest('model')
     if model:
         lineage = LineageView()
-        lineage.process_model_data(model.content)
+        lineage.process_model_data(decoded_model(model))
         unused = lineage.get_unused_measures()
         return render_template('unused_measures.html', measures=unused)
     return render_template('unused_measures.html', measures=[])
 
+@bp.route('/dax-hotspots')
+@conditional('model')
+def dax_hotspots():
+    sort = request.args.get('sort', 'score')
+    descending = request.args.get('order', 'desc') != 'asc'
+    analyzer = get_model_analysis('dax-hotspots', build_dax_hotspots)
+    hotspots = analyzer.report(sort, descending) if analyzer else []
+    return render_template('dax_hotspots.html', hotspots=hotspots, sort=sort, descending=descending)
+
+@bp.route('/api/dax-hotspots')
+@conditional('model')
+def dax_hotspots_api():
+    analyzer = get_model_analysis('dax-hotspots', build_dax_hotspots)
+    if not analyzer:
+        return jsonify({'error': 'No model uploaded'}), 404
+    sort = request.args.get('sort', 'score')
+    descending = request.args.get('order', 'desc') != 'asc'
+    return jsonify(analyzer.report(sort, descending))
+
+@bp.route('/report-audit')
+@conditional('report', 'model')
+def report_audit():
+    pages, budgets = get_report_audit()
+    return render_template('report_audit.html', pages=pages or [], budgets=budgets)
+
+@bp.route('/api/report-audit')
+@conditional('report', 'model')
+def report_audit_api():
+    pages, budgets = get_report_audit()
+    if pages is None:
+        return jsonify({'error': 'No report uploaded'}), 404
+    return jsonify({'budgets': budgets, 'pages': pages})
+
+@bp.route('/memory-advisor')
+@conditional('model', 'report')
+def memory_advisor():
+    advisor = get_model_analysis('memory', build_memory_advisor)
+    if not advisor:
+        return render_template('memory_advisor.html', columns=[], summary=None)
+    return render_template('memory_advisor.html', columns=advisor.candidates, summary=advisor.summary())
+
+@bp.route('/api/memory-advisor')
+@conditional('model', 'report')
+def memory_advisor_api():
+    advisor = get_model_analysis('memory', build_memory_advisor)
+    if not advisor:
+        return jsonify({'error': 'No model uploaded'}), 404
+    return jsonify({'summary': advisor.summary(), 'columns': advisor.candidates})
+
+@bp.route('/relationships')
+@conditional('model')
+def relationships():
+    analysis = get_model_analysis('relationships', build_relationship_analysis)
+    return render_template('relationships.html', analysis=analysis)
+
+@bp.route('/api/relationships')
+@conditional('model')
+def relationships_api():
+    analysis = get_model_analysis('relationships', build_relationship_analysis)
+    if analysis is None:
+        return jsonify({'error': 'No model uploaded'}), 404
+    return jsonify(analysis)
+
+def get_dax_threshold():
+    threshold = request.args.get('threshold', DEFAULT_THRESHOLD, type=float)
+    return min(max(threshold, 0.0), 1.0)
+
+@bp.route('/dax-duplicates')
+def dax_duplicates():
+    index = sync_dax_index()
+    threshold = get_dax_threshold()
+    return render_template(
+        'dax_duplicates.html',
+        summary=index.summary(),
+        duplicates=index.duplicates(cross_model_only=True),
+        near=index.near_duplicates(threshold),
+        threshold=threshold
+    )
+
+@bp.route('/api/dax-duplicates')
+def dax_duplicates_api():
+    """Exact and near-duplicate measures across every stored model"""
+    index = sync_dax_index()
+    threshold = get_dax_threshold()
+    cross_model_only = request.args.get('cross_model', '1') != '0'
+    return jsonify({
+        'summary': index.summary(),
+        'threshold': threshold,
+        'duplicates': index.duplicates(cross_model_only=cross_model_only),
+        'near_duplicates': index.near_duplicates(threshold)
+    })
+
+@bp.route('/api/dax-similar')
+def dax_similar():
+    """Measures in any stored model similar to one measure, e.g.
+    ?model=model.json&measure=Table[Measure]"""
+    model_name = request.args.get('model', '').strip()
+    measure = request.args.get('measure', '').strip()
+    if not model_name or not measure:
+        return jsonify({'error': "Missing 'model' or 'measure' parameter"}), 400
+    index = sync_dax_index()
+    expression = index.find(model_name, measure)
+    if expression is None:
+        return jsonify({'error': f'Unknown measure: {measure} in {model_name}'}), 404
+    return jsonify({
+        'model': model_name,
+        'measure': measure,
+        'duplicates': [m for m in index.describe(expression)['measures']
+                       if (m['model'], m['measure']) != (model_name, measure)],
+        'similar': index.similar(expression, get_dax_threshold())
+    })
+
+@bp.route('/api/impact')
+@conditional('model', 'report')
+def impact_analysis():
+    object_id = request.args.get('object', '').strip()
+    if not object_id:
+        return jsonify({'error': "Missing 'object' parameter, e.g. ?object=Table[Column]"}), 400
+    analyzer = get_model_analysis('impact', build_impact_analyzer)
+    if not analyzer:
+        return jsonify({'error': 'No model uploaded'}), 404
+    if object_id not in analyzer.graph:
+        return jsonify({'error': f'Unknown column or measure: {object_id}'}), 404
+    return jsonify({'object': object_id, 'impact': analyzer.impact(object_id)})
+
+@bp.route('/api/search')
+@conditional('model', 'report')
+def search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': "Missing 'q' parameter"}), 400
+    index = get_model_analysis('search', build_search_index)
+    if not index:
+        return jsonify({'error': 'No model uploaded'}), 404
+    kinds = [kind for kind in request.args.get('kind', '').split(',') if kind]
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    return jsonify(index.search(query, kinds=kinds, page=page, per_page=per_page))
+
+VISUAL_COLUMNS = ['page', 'visual_type', 'visual_name', 'fields', 'filters', 'vc_objects', 'objects']
+
+def iter_visual_rows(content):
+    for row in DataProcessor().iter_rows(content):
+        if row:
+            yield dict(zip(VISUAL_COLUMNS, row))
+
+def iter_lineage_edges(content):
+    lineage = LineageView()
+    lineage.process_model_data(content)
+    return lineage.iter_edges()
+
+def iter_dax_rows(content):
+    lineage = LineageView()
+    lineage.process_model_data(content)
+    for measure, expression in lineage.iter_dax_expressions():
+        yield {'measure': measure, 'expression': expression}
+
+def iter_m_query_rows(content):
+    for query in PowerBIParser().iter_m_queries(content):
+        yield {'name': query.get('table_name') or query.get('name', ''),
+               'type': query['type'], 'query': query['query']}
+
+# dataset -> (file kind, columns, row iterator over the file content)
+EXPORT_DATASETS = {
+    'visuals': ('report', VISUAL_COLUMNS, iter_visual_rows),
+    'lineage-edges': ('model', ['from', 'to', 'type'], iter_lineage_edges),
+    'dax-expressions': ('model', ['measure', 'expression'], iter_dax_rows),
+    'm-queries': ('model', ['name', 'type', 'query'], iter_m_query_rows),
+}
+
+@bp.route('/export/<dataset>.<fmt>')
+@conditional('model', 'report')
+def export(dataset, fmt):
+    """Streams a dataset as CSV, JSON lines or an Arrow IPC stream,
+    row by row, without building the whole result in memory."""
+    if dataset not in EXPORT_DATASETS:
+        return jsonify({'error': f'Unknown dataset: {dataset}'}), 404
+    if fmt not in exporters.FORMATS:
+        return jsonify({'error': f'Unknown format: {fmt}'}), 404
+    if fmt == 'arrow' and not exporters.arrow_available():
+        return jsonify({'error': 'Arrow export requires pyarrow'}), 400
+    kind, columns, iter_rows = EXPORT_DATASETS[dataset]
+    model = model_store.latest(kind)
+    if not model:
+        return jsonify({'error': f'No {kind} uploaded'}), 404
+    content = model.content
+    body = exporters.STREAMERS[fmt](columns, iter_rows(content))
+    response = Response(stream_with_context(body), mimetype=exporters.FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename={dataset}.{fmt}'
+    return response
+
+def create_app(config=None):
+    """Application factory. Importing this module has no side effects;
+    the database binding, table creation and job runner are set up here."""
+    app = Flask(__name__)
+    # Without DATABASE_URL, an embedded SQLite database in the instance folder
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(app.instance_path)
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Page budgets for the report audit, e.g. '{"queries_per_page": 10}'
+    app.config['REPORT_AUDIT_BUDGETS'] = json.loads(os.getenv('REPORT_AUDIT_BUDGETS', '{}'))
+    app.config['JOB_WORKERS'] = int(os.getenv('JOB_WORKERS', '2'))
+    # Finished job records older than this are deleted from the jobs folder
+    app.config['JOB_RETENTION_DAYS'] = float(os.getenv('JOB_RETENTION_DAYS', '7'))
+    if config:
+        app.config.update(config)
+    # Pool size, overflow, timeout and recycle come from DB_POOL_* variables
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    # Part of every page ETag, so editing a template invalidates cached pages
+    app.config['TEMPLATE_VERSION'] = http_cache.directory_version(os.path.join(app.root_path, 'templates'))
+    # Pages embed static ?v= fingerprints, so a changed asset must change their ETags too
+    app.config['STATIC_VERSION'] = http_cache.tree_version(app.static_folder)
+
+    # Initialize database
+    db.init_app(app)
+
+    # Create tables, and upgrade ones created before uploads recorded their kind
+    with app.app_context():
+        configure_sqlite(db.engine)
+        enable_pgvector(db.engine)
+        db.create_all()
+        model_store.upgrade_schema()
+
+    # Upload processing runs here, so request workers stay free to serve reads
+    app.extensions['jobs'] = JobRunner(
+        os.path.join(app.instance_path, 'jobs'),
+        max_workers=app.config['JOB_WORKERS'],
+        retention=app.config['JOB_RETENTION_DAYS'] * 24 * 3600
+    )
+    # Measures of every model stored in this app's database, indexed for
+    # cross-model duplicate detection
+    app.extensions['dax_index'] = DaxSimilarityIndex()
+
+    app.register_blueprint(bp)
+    return app
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    create_app().run(host='0.0.0.0', port=5000)
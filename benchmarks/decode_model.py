@@ -0,0 +1,82 @@
+"""Decode benchmark: generic json.loads dict trees versus the typed records
+of utils.model_schema, on data/model.json or any .bim/model.json file.
+
+    python benchmarks/decode_model.py [path] --repeat 20
+
+For each decoder it reports the median decode time, the peak memory
+allocated while decoding and the memory still held by the result, both
+measured with tracemalloc.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils import model_schema  # noqa: E402
+
+
+def records_with(loads):
+    """decode_model using a specific JSON parser, regardless of what is installed."""
+    def decode(content):
+        data = loads(content)
+        return model_schema.Model.decode(data['model'])
+    return decode
+
+
+def decoders():
+    candidates = [
+        ('json.loads (dict tree)', json.loads),
+        ('records via json', records_with(json.loads)),
+    ]
+    if model_schema.orjson is not None:
+        candidates.append(('orjson.loads (dict tree)', model_schema.orjson.loads))
+        candidates.append(('records via orjson', records_with(model_schema.orjson.loads)))
+    return candidates
+
+
+def measure_time(decode, content, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(content)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def measure_memory(decode, content):
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = decode(content)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (peak - baseline) / 1024 / 1024, (retained - baseline) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', default=os.path.join(ROOT, 'data', 'model.json'))
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.path, encoding='utf-8') as file:
+        content = file.read()
+    print(f"{args.path}: {len(content) / 1024 / 1024:.1f} MB, default backend: {model_schema.backend()}")
+    print(f"{'decoder':28s} {'median ms':>10s} {'peak MB':>9s} {'retained MB':>12s}")
+    for name, decode in decoders():
+        elapsed = measure_time(decode, content, args.repeat)
+        peak, retained = measure_memory(decode, content)
+        print(f"{name:28s} {elapsed:10.1f} {peak:9.1f} {retained:12.2f}")
+
+
+if __name__ == '__main__':
+    main()
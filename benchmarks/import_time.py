@@ -0,0 +1,102 @@
+"""Cold-start benchmark: times ``import app`` and ``create_app()`` in fresh
+interpreters and fails when either exceeds its budget or when the NLP stack
+is loaded at startup.
+
+    python benchmarks/import_time.py --runs 5 --import-budget-ms 400
+
+Each run is a new process, so nothing is shared through sys.modules or the
+filesystem cache of an earlier run beyond what the OS keeps. The slowest
+modules are taken from ``python -X importtime``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported on first use, never at startup
+LAZY_MODULES = ['openai', 'numpy', 'spacy', 'langchain', 'langchain_core', 'langchain_openai', 'pyarrow']
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app({'JOB_WORKERS': 1})
+created = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'loaded': [name for name in %r if name in sys.modules]
+}))
+""" % (LAZY_MODULES,)
+
+
+def run_probe(env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_output, count):
+    """Top-level packages by cumulative import time, from -X importtime."""
+    totals = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        package = name.strip().split('.')[0]
+        totals[package] = max(totals.get(package, 0), int(cumulative))
+    return sorted(totals.items(), key=lambda item: -item[1])[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float, default=None,
+                        help='fail if the median import time exceeds this')
+    parser.add_argument('--create-budget-ms', type=float, default=None,
+                        help='fail if the median create_app() time exceeds this')
+    parser.add_argument('--top', type=int, default=10, help='slowest packages to list')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+    samples = []
+    importtime_output = ''
+    for _ in range(args.runs):
+        sample, importtime_output = run_probe(env)
+        samples.append(sample)
+
+    import_ms = statistics.median(s['import_ms'] for s in samples)
+    create_ms = statistics.median(s['create_app_ms'] for s in samples)
+    print(f"import app:    median {import_ms:8.1f} ms over {args.runs} runs")
+    print(f"create_app():  median {create_ms:8.1f} ms")
+    print('slowest packages (cumulative, last run):')
+    for package, micros in slowest_imports(importtime_output, args.top):
+        print(f"  {package:30s} {micros / 1000:8.1f} ms")
+
+    failures = []
+    loaded = sorted({name for s in samples for name in s['loaded']})
+    if loaded:
+        failures.append(f"loaded at startup: {', '.join(loaded)}")
+    if args.import_budget_ms is not None and import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.1f} ms (budget {args.import_budget_ms} ms)")
+    if args.create_budget_ms is not None and create_ms > args.create_budget_ms:
+        failures.append(f"create_app() took {create_ms:.1f} ms (budget {args.create_budget_ms} ms)")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
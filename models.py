@@ -0,0 +1,77 @@
+import json
+from datetime import datetime
+from sqlalchemy.orm import deferred
+from sqlalchemy.types import TypeDecorator, UserDefinedType
+from utils.database import db
+
+EMBEDDING_DIMENSIONS = 1536
+
+class Vector(UserDefinedType):
+    """pgvector's ``vector(n)`` column, exchanged in its '[x,y,...]' text form"""
+    cache_ok = True
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+
+    def get_col_spec(self, **kw):
+        return f'VECTOR({self.dimensions})'
+
+class Embedding(TypeDecorator):
+    """A list of floats: a pgvector column on PostgreSQL with the vector
+    extension, JSON elsewhere.
+
+    The stored type follows the database (see ``enable_pgvector``), not
+    whether the pgvector Python package is installed. Distance search needs
+    PostgreSQL with pgvector.
+    """
+    impl = db.JSON
+    cache_ok = True
+
+    class comparator_factory(TypeDecorator.Comparator):
+        def cosine_distance(self, other):
+            return self.op('<=>', return_type=db.Float)(other)
+
+    def load_dialect_impl(self, dialect):
+        if getattr(dialect, 'has_pgvector', False):
+            return dialect.type_descriptor(Vector(EMBEDDING_DIMENSIONS))
+        return dialect.type_descriptor(db.JSON())
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and getattr(dialect, 'has_pgvector', False):
+            return '[' + ','.join(str(float(x)) for x in value) + ']'
+        return value
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+class PowerBIModel(db.Model):
+    """An uploaded file: a model, a report or a TSV lineage export.
+
+    ``content`` is deferred, so listing rows or looking up the latest one
+    does not read the file; it is loaded on first access.
+    """
+    __table_args__ = (
+        db.Index('ix_power_bi_model_kind_created_at', 'kind', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(255))
+    kind = db.Column(db.String(16))
+    content_hash = db.Column(db.String(40))
+    content = deferred(db.Column(db.Text))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class Query(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    text = db.Column(db.Text)
+    result = deferred(db.Column(db.Text))
+    model_id = db.Column(db.Integer, db.ForeignKey('power_bi_model.id', ondelete='CASCADE'), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class FileEmbedding(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    file_id = db.Column(db.Integer, db.ForeignKey('power_bi_model.id', ondelete='CASCADE'), index=True)
+    content_chunk = db.Column(db.Text)
+    embedding = db.Column(Embedding)
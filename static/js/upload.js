@@ -1,3 +1,68 @@
+const JOB_POLL_INTERVAL = 1000;
+
+function showJobProgress(uploadStatus, job) {
+    uploadStatus.textContent = `${job.message} (${job.progress}%)`;
+    uploadStatus.className = 'info';
+}
+
+function finishJob(uploadStatus, job) {
+    if (job.status === 'succeeded') {
+        uploadStatus.textContent = 'File processed successfully';
+        uploadStatus.className = 'success';
+        setTimeout(() => {
+            window.location.reload();
+        }, 1000);
+    } else {
+        uploadStatus.textContent = 'Processing failed: ' + (job.error || 'unknown error');
+        uploadStatus.className = 'error';
+    }
+}
+
+function pollJob(uploadStatus, statusUrl) {
+    const timer = setInterval(async () => {
+        try {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            if (job.status === 'succeeded' || job.status === 'failed') {
+                clearInterval(timer);
+                finishJob(uploadStatus, job);
+            } else {
+                showJobProgress(uploadStatus, job);
+            }
+        } catch (error) {
+            clearInterval(timer);
+            uploadStatus.textContent = 'Lost track of processing: ' + error;
+            uploadStatus.className = 'error';
+        }
+    }, JOB_POLL_INTERVAL);
+}
+
+function followJob(uploadStatus, result) {
+    if (!window.EventSource) {
+        pollJob(uploadStatus, result.status_url);
+        return;
+    }
+    const events = new EventSource(result.events_url);
+    let finished = false;
+    events.onmessage = (event) => {
+        const job = JSON.parse(event.data);
+        if (job.status === 'succeeded' || job.status === 'failed') {
+            finished = true;
+            events.close();
+            finishJob(uploadStatus, job);
+        } else {
+            showJobProgress(uploadStatus, job);
+        }
+    };
+    events.onerror = () => {
+        events.close();
+        // The stream ended without a final state; fall back to polling
+        if (!finished) {
+            pollJob(uploadStatus, result.status_url);
+        }
+    };
+}
+
 document.addEventListener('DOMContentLoaded', function() {
     const uploadForm = document.getElementById('uploadForm');
     const fileInput = document.getElementById('fileInput');
@@ -18,7 +83,11 @@ document.addEventListener('DOMContentLoaded', function() {
             });
             const result = await response.json();
             
-            if (result.success) {
+            if (result.success && result.job_id) {
+                uploadStatus.textContent = result.message;
+                uploadStatus.className = 'info';
+                followJob(uploadStatus, result);
+            } else if (result.success) {
                 uploadStatus.textContent = result.message;
                 uploadStatus.className = 'success';
                 setTimeout(() => {
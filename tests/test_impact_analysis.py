@@ -0,0 +1,69 @@
+import random
+from array import array
+
+import pytest
+
+from utils.impact_analysis import IMPACT_TYPES, ImpactAnalyzer
+
+NODE_TYPES = IMPACT_TYPES + (None,)
+
+
+def random_analyzer(seed):
+    """An analyzer over a random graph with cycles, sparse chains and a few
+    hubs, so both the bitset and the sorted array reach encodings occur."""
+    rng = random.Random(seed)
+    analyzer = ImpactAnalyzer()
+    graph = analyzer.graph
+    size = rng.randrange(40, 400)
+    names = []
+    for position in range(size):
+        kind = rng.choice(NODE_TYPES)
+        name = f"{kind}:n{position}" if kind in ('visual', 'page') else f"T[n{position}]"
+        graph.add_node(name, type=kind, declare=kind is not None)
+        names.append(name)
+    for _ in range(rng.randrange(size // 2, size * 2)):
+        source = rng.randrange(size)
+        if rng.random() < 0.8:
+            target = rng.randrange(source, min(size, source + 5))
+        else:
+            target = rng.randrange(size)
+        graph.add_edge(names[source], names[target])
+    for hub in rng.sample(range(size), 3):
+        for target in rng.sample(range(size), size // 4):
+            graph.add_edge(names[hub], names[target])
+    analyzer._build_reachability_index()
+    return analyzer, names
+
+
+def expected_impact(analyzer, index):
+    graph = analyzer.graph
+    expected = {kind: set() for kind in IMPACT_TYPES}
+    for node in graph.reachable([index]):
+        record = graph.records[node]
+        if node != index and record.type in expected:
+            label = record.label
+            if record.type in ('page', 'visual'):
+                label = label.split(':', 1)[1]
+            expected[record.type].add(label)
+    return expected
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_reach_index_matches_graph_traversal(seed):
+    analyzer, names = random_analyzer(seed)
+    graph = analyzer.graph
+    for index, name in enumerate(names):
+        reached = set(graph.reachable([index]))
+        for target_index, target in enumerate(names):
+            if target_index != index:
+                assert analyzer.affects(name, target) == (target_index in reached), (name, target)
+        impact = {kind: set(labels) for kind, labels in analyzer.impact(name).items()}
+        assert impact == expected_impact(analyzer, index), name
+
+
+def test_random_graphs_use_both_reach_encodings():
+    encodings = set()
+    for seed in range(20):
+        analyzer, _ = random_analyzer(seed)
+        encodings.update(type(reach) for reach in analyzer._reach if reach)
+    assert encodings == {int, array}
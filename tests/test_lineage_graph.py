@@ -0,0 +1,24 @@
+from utils.lineage_graph import LineageGraph
+
+
+def test_freeze_drops_repeated_edges_keeping_first():
+    graph = LineageGraph()
+    graph.add_edge('a', 'b')
+    graph.add_edge('a', 'c', kind='depends_on')
+    graph.add_edge('a', 'b', kind='depends_on')
+    graph.add_edge('c', 'b')
+    graph.add_edge('a', 'c')
+    assert list(graph.iter_edges()) == [('a', 'b', None), ('a', 'c', 'depends_on'), ('c', 'b', None)]
+    assert graph.edge_count == 3
+    assert list(graph.successors(graph.index_of('a'))) == [graph.index_of('b'), graph.index_of('c')]
+    assert list(graph.predecessors(graph.index_of('b'))) == [graph.index_of('a'), graph.index_of('c')]
+
+
+def test_edges_added_after_freeze_are_deduplicated():
+    graph = LineageGraph()
+    graph.add_edge('a', 'b')
+    graph.freeze()
+    graph.add_edge('a', 'b')
+    graph.add_edge('b', 'a')
+    assert graph.edge_count == 2
+    assert sorted(graph.descendants('a')) == ['a', 'b']
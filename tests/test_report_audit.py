@@ -0,0 +1,55 @@
+from utils.report_audit import ReportAuditor
+
+
+def relationship(from_table, to_table, **fields):
+    return dict(fromTable=from_table, fromColumn='Key', toTable=to_table, toColumn='Key', **fields)
+
+
+MODEL = {
+    'model': {
+        'tables': [
+            {'name': 'Sales', 'columns': [{'name': 'Key'}, {'name': 'Amount'}]},
+            {'name': 'Product', 'columns': [{'name': 'Key'}, {'name': 'Category'}]},
+            {'name': 'Category', 'columns': [{'name': 'Key'}, {'name': 'Group'}]},
+            {'name': 'Date', 'columns': [{'name': 'Key'}, {'name': 'Year'}]},
+            {'name': 'Basis Measures', 'measures': [
+                {'name': 'Total', 'expression': 'SUM(Sales[Amount])'},
+                {'name': 'Total LY', 'expression': 'CALCULATE([Total], Date[Year] = 2023)'},
+            ]},
+        ],
+        'relationships': [
+            relationship('Sales', 'Product'),
+            relationship('Product', 'Category'),
+            relationship('Sales', 'Date'),
+            relationship('Sales', 'Category', isActive=False),
+        ],
+    }
+}
+
+
+def test_disconnected_first_table_is_ignored():
+    auditor = ReportAuditor(model_data=MODEL)
+    # 'Basis Measures' sorts first and has no relationships
+    assert auditor.relationships_crossed(['Basis Measures', 'Category', 'Date']) == 3
+    assert auditor.relationships_crossed(['Category', 'Date']) == 3
+
+
+def test_paths_are_unioned_across_tables():
+    auditor = ReportAuditor(model_data=MODEL)
+    assert auditor.relationships_crossed(['Category', 'Product', 'Sales', 'Date']) == 3
+    assert auditor.relationships_crossed(['Sales']) == 0
+
+
+def test_measures_touch_the_tables_their_dax_reads():
+    auditor = ReportAuditor(model_data=MODEL)
+    assert auditor.tables_of_measure('Basis Measures[Total]') == {'Sales'}
+    assert auditor.tables_of_measure('Basis Measures[Total LY]') == {'Sales', 'Date'}
+    tables = auditor.tables_touched(['Basis Measures[Total LY]'], ['Category[Group]'])
+    assert tables == {'Sales', 'Date', 'Category'}
+    assert auditor.relationships_crossed(tables) == 3
+
+
+def test_without_a_model_every_table_needs_a_join():
+    auditor = ReportAuditor()
+    assert auditor.relationships_crossed(['A', 'B', 'C']) == 2
+    assert auditor.tables_of_measure('Basis Measures[Total]') == {'Basis Measures'}
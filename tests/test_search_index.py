@@ -0,0 +1,34 @@
+import json
+
+from utils.search_index import SearchIndex
+
+MODEL = json.dumps({
+    'model': {
+        'tables': [
+            {'name': 'Basis Measures', 'measures': [
+                {'name': 'FYFC', 'expression': "SUM('Sales & Returns'[Amount])"},
+            ]},
+            {'name': 'Sales & Returns', 'columns': [{'name': 'Amount', 'dataType': 'double'}]},
+        ]
+    }
+})
+
+
+def keys(index, query):
+    return [result['key'] for result in index.search(query)['results']]
+
+
+def test_references_to_tables_with_spaces():
+    index = SearchIndex()
+    index.build(MODEL)
+    assert keys(index, "'Basis Measures'[FYFC]") == ['Basis Measures[FYFC]']
+    assert keys(index, 'Basis Measures[FYFC]') == ['Basis Measures[FYFC]']
+    assert keys(index, "'Sales & Returns'[Amount]") == ['Sales & Returns[Amount]', 'Basis Measures[FYFC]']
+
+
+def test_field_lists_are_not_split_into_partial_references():
+    index = SearchIndex()
+    index.add_document('visual', 'Page', 'Page / card', 'Basis Measures[FYFC]',
+                       text_references=[('Basis Measures', 'FYFC')])
+    assert keys(index, "'Basis Measures'[FYFC]") == ['Page']
+    assert keys(index, 'Measures[FYFC]') == []
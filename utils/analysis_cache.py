@@ -0,0 +1,42 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+MAX_ENTRIES = 32
+
+_entries: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def content_hash(content: str) -> str:
+    """Returns a stable hash of uploaded file content."""
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def get_or_build(key: Tuple[Hashable, ...], builder: Callable[[], Any]) -> Any:
+    """Returns the cached analysis for ``key``, building it on first use.
+
+    Keys should include the content hash of every input file, so a new
+    upload naturally misses the cache. The least recently used entries are
+    evicted once more than MAX_ENTRIES analyses are held.
+    """
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            return _entries[key]
+
+    value = builder()
+
+    with _lock:
+        _entries[key] = value
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+    return value
+
+
+def clear() -> None:
+    """Drops every cached analysis."""
+    with _lock:
+        _entries.clear()
@@ -1,37 +1,46 @@
 import json
 import logging
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# visuals_data columns that hold "; "-separated field references
+FIELD_COLUMNS = (3, 4, 5, 6)
+
 class DataProcessor:
     """Processes the report JSON file to extract visual data."""
 
     def __init__(self):
         self.json_file_path = None
         self.visuals_data: List[List[str]] = []
-        self.data: Dict[str, Any] = {}
 
     def process_json(self, content: str) -> None:
         """Processes the JSON content and extracts data into visuals_data."""
+        self.visuals_data.extend(self.iter_rows(content))
+
+    def iter_rows(self, content: str) -> Iterator[List[str]]:
+        """Yields visual and filter rows one at a time, without keeping them
+        or the decoded report on the processor."""
         try:
-            self.data = json.loads(content)
+            data = json.loads(content)
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing the JSON content: {e}")
             return
 
-        filters_str = self.data.get('filters', '[]')
+        filters_str = data.get('filters', '[]')
         page_filters = self.safe_json_loads(filters_str)
         if page_filters:
             filter_name = page_filters[0].get('name', '')
             page_filter_fields = self.extract_filter_fields(page_filters)
             if page_filter_fields:
-                self.visuals_data.append(
-                    ['All Pages', 'Global Level Filters', filter_name, '', page_filter_fields, '', '']
-                )
+                yield ['All Pages', 'Global Level Filters', filter_name, '', page_filter_fields, '', '']
 
-        for section in self.data.get('sections', []):
-            self.process_section(section)
+        sections = data.pop('sections', [])
+        del data
+        # Pop sections as they are consumed, so their decoded JSON is freed while streaming
+        sections.reverse()
+        while sections:
+            yield from self.iter_section_rows(sections.pop())
 
     def safe_json_loads(self, data: Any) -> Any:
         """Safely loads JSON data from a string or returns the data if already a dict."""
@@ -45,6 +54,10 @@ class DataProcessor:
 
     def process_section(self, section: Dict[str, Any]) -> None:
         """Processes a section of the report."""
+        self.visuals_data.extend(self.iter_section_rows(section))
+
+    def iter_section_rows(self, section: Dict[str, Any]) -> Iterator[List[str]]:
+        """Yields the filter and visual rows of a section of the report."""
         filters_str = section.get('filters', '[]')
         section_filters = self.safe_json_loads(filters_str)
         page_name = section.get('displayName', '')
@@ -52,16 +65,17 @@ class DataProcessor:
             filter_name = section_filters[0].get('name', '')
             section_filter_fields = self.extract_filter_fields(section_filters)
             if section_filter_fields:
-                self.visuals_data.append(
-                    [page_name, 'Page Level Filters', filter_name, '', section_filter_fields, '', '']
-                )
+                yield [page_name, 'Page Level Filters', filter_name, '', section_filter_fields, '', '']
 
         for visual in section.get('visualContainers', []):
-            visual_data = self.extract_visual_data(visual, page_name)
-            self.visuals_data.append(visual_data)
+            yield self.extract_visual_data(visual, page_name)
 
     def extract_filter_fields(self, filter_data: List[Dict[str, Any]]) -> str:
         """Extracts filter fields from filter data."""
+        return "; ".join(self.extract_filter_refs(filter_data))
+
+    def extract_filter_refs(self, filter_data: List[Dict[str, Any]]) -> List[str]:
+        """Extracts filter field references as a list of Entity[Property]."""
         filter_fields = []
         for f in filter_data:
             expression = f.get('expression', {})
@@ -72,10 +86,33 @@ class DataProcessor:
                         property_name = expr.get('Property', '')
                         if entity and property_name:
                             filter_fields.append(f"{entity}[{property_name}]")
-        return "; ".join(filter_fields)
+        return filter_fields
 
     def extract_visual_data(self, visual: Dict[str, Any], page_name: str) -> List[str]:
         """Extracts data from a visual."""
+        fields = self.extract_visual_fields(visual)
+        if fields is None:
+            return [page_name, "Unknown visual type", "", "", "", '', '']
+        if not fields['has_query']:
+            return [page_name, fields['visual_type'], fields['visual_name'], "", "", '', '']
+
+        return [
+            page_name,
+            fields['visual_type'],
+            fields['visual_name'],
+            "; ".join(field for field, _ in fields['select']),
+            "; ".join(fields['filters']),
+            fields['vc_objects'],
+            fields['objects']
+        ]
+
+    def extract_visual_fields(self, visual: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extracts a visual's type, name and field references as structured data.
+
+        ``select`` holds (Entity[Property], kind) pairs, where kind is 'Column',
+        'Aggregation' or 'Measure' as written in the prototype query. Returns
+        None if the visual has no recognizable visual configuration.
+        """
         config_str = visual.get('config', '{}')
         config = self.safe_json_loads(config_str)
 
@@ -86,56 +123,64 @@ class DataProcessor:
                 break
 
         if not visual_config:
-            return [page_name, "Unknown visual type", "", "", "", '', '']
-
-        visual_type = visual_config.get('visualType', '')
-        visual_name = config.get('name', '')
-
-        if 'prototypeQuery' not in visual_config:
-            return [page_name, visual_type, visual_name, "", "", '', '']
+            return None
+
+        fields = {
+            'visual_type': visual_config.get('visualType', ''),
+            'visual_name': config.get('name', ''),
+            'has_query': 'prototypeQuery' in visual_config,
+            'select': [],
+            'filters': [],
+            'vc_objects': '',
+            'objects': ''
+        }
+        if not fields['has_query']:
+            return fields
 
         entity_aliases = {
             item['Name']: item['Entity']
             for item in visual_config['prototypeQuery'].get('From', [])
         }
 
-        select_fields = self.extract_fields(
+        fields['select'] = self.extract_field_refs(
             visual_config['prototypeQuery'].get('Select', []), entity_aliases
         )
 
         filter_data_str = visual.get('filters', '[]')
         filter_data = self.safe_json_loads(filter_data_str)
-        filter_fields = self.extract_filter_fields(filter_data)
+        fields['filters'] = self.extract_filter_refs(filter_data)
 
         object_data = visual_config.get('objects', {})
-        object_fields = self.extract_vc_objects_fields(object_data)
+        fields['objects'] = self.extract_vc_objects_fields(object_data)
 
         vc_objects_data = visual_config.get('vcObjects', {})
-        vc_objects_fields = self.extract_vc_objects_fields(vc_objects_data)
+        fields['vc_objects'] = self.extract_vc_objects_fields(vc_objects_data)
 
-        return [
-            page_name,
-            visual_type,
-            visual_name,
-            select_fields,
-            filter_fields,
-            vc_objects_fields,
-            object_fields
-        ]
+        return fields
 
     def extract_fields(
         self, fields: List[Dict[str, Any]], entity_aliases: Dict[str, str]
     ) -> str:
         """Extracts field names from select fields."""
+        return "; ".join(field for field, _ in self.extract_field_refs(fields, entity_aliases))
+
+    def extract_field_refs(
+        self, fields: List[Dict[str, Any]], entity_aliases: Dict[str, str]
+    ) -> List[Tuple[str, str]]:
+        """Extracts (Entity[Property], kind) pairs from select fields."""
         extracted_fields = []
         for field in fields:
             field_details = None
+            kind = ''
             if 'Column' in field:
                 field_details = field['Column']
+                kind = 'Column'
             elif 'Aggregation' in field:
                 field_details = field['Aggregation']['Expression']['Column']
+                kind = 'Aggregation'
             elif 'Measure' in field:
                 field_details = field['Measure']
+                kind = 'Measure'
 
             if not field_details:
                 continue
@@ -148,9 +193,9 @@ class DataProcessor:
 
             if entity_name and property_name:
                 field_name = f"{entity_name}[{property_name}]"
-                extracted_fields.append(field_name)
+                extracted_fields.append((field_name, kind))
 
-        return "; ".join(extracted_fields)
+        return extracted_fields
 
     def extract_vc_objects_fields(self, vc_object: Any, current_entity: Optional[str] = None) -> str:
         """Recursively extracts fields from vcObjects or objects data."""
@@ -199,7 +244,7 @@ class DataProcessor:
         """Extracts used measures from visuals_data."""
         used_measures = set()
         for visual_data in self.visuals_data:
-            for index in [3, 4, 5, 6]:
+            for index in FIELD_COLUMNS:
                 if index < len(visual_data):
                     fields = visual_data[index].split('; ')
                     for field in fields:
@@ -1,7 +1,82 @@
+import logging
+import os
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
+
+logger = logging.getLogger(__name__)
+
+# Pool settings for server databases, overridable from the environment
+POOL_DEFAULTS = {
+    'pool_size': ('DB_POOL_SIZE', 5),
+    'max_overflow': ('DB_MAX_OVERFLOW', 10),
+    'pool_timeout': ('DB_POOL_TIMEOUT', 30),
+    'pool_recycle': ('DB_POOL_RECYCLE', 1800),
+}
+
+def database_uri(instance_path):
+    """DATABASE_URL, or an embedded SQLite file in the instance folder"""
+    uri = os.getenv('DATABASE_URL')
+    if uri:
+        # SQLAlchemy only accepts the postgresql:// scheme
+        return uri.replace('postgres://', 'postgresql://', 1) if uri.startswith('postgres://') else uri
+    os.makedirs(instance_path, exist_ok=True)
+    return 'sqlite:///' + os.path.join(instance_path, 'powerbi.db')
+
+def engine_options(uri):
+    """Connection pool settings; SQLite keeps SQLAlchemy's default pool."""
+    if uri.startswith('sqlite'):
+        return {}
+    options = {name: int(os.getenv(env, default)) for name, (env, default) in POOL_DEFAULTS.items()}
+    options['pool_pre_ping'] = True
+    return options
+
+def configure_sqlite(engine):
+    """Turns on WAL for SQLite, so readers do not block the upload writer,
+    and waits for locks instead of failing with 'database is locked'."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(connection, _):
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA busy_timeout=5000')
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+def enable_pgvector(engine):
+    """Creates the vector extension used by FileEmbedding.embedding when the
+    server offers it. Only the NLP queries need it, so a server without
+    pgvector, or a role that may not create extensions, is logged and the
+    embeddings are stored as JSON instead. The outcome is recorded as
+    ``engine.dialect.has_pgvector`` for the Embedding column type."""
+    engine.dialect.has_pgvector = False
+    if engine.dialect.name != 'postgresql':
+        return False
+    with engine.connect() as connection:
+        installed = connection.execute(text(
+            "SELECT 1 FROM pg_extension WHERE extname = 'vector'"
+        )).scalar() is not None
+        available = installed or connection.execute(text(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'vector'"
+        )).scalar() is not None
+    if not available:
+        logger.warning("pgvector is not available on this server; embeddings are stored as JSON")
+        return False
+    if not installed:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text('CREATE EXTENSION IF NOT EXISTS vector'))
+        except DBAPIError as e:
+            logger.warning(f"Could not create the vector extension, embeddings are stored as JSON: {e}")
+            return False
+    engine.dialect.has_pgvector = True
+    return True
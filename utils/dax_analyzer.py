@@ -0,0 +1,259 @@
+import hashlib
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .model_lineage import ModelLineage, strip_dax_noise
+from .model_schema import Model, decode_model
+
+ITERATORS = {
+    'SUMX', 'AVERAGEX', 'COUNTX', 'COUNTAX', 'MINX', 'MAXX', 'PRODUCTX',
+    'CONCATENATEX', 'RANKX', 'MEDIANX', 'PERCENTILEX.INC', 'PERCENTILEX.EXC',
+    'STDEVX.P', 'STDEVX.S', 'VARX.P', 'VARX.S', 'GEOMEANX', 'FILTER', 'ADDCOLUMNS',
+}
+CALCULATE_FUNCTIONS = {'CALCULATE', 'CALCULATETABLE'}
+ALL_FUNCTIONS = {'ALL', 'ALLEXCEPT'}
+
+# Cost weight per occurrence of each pattern
+PATTERN_WEIGHTS = {
+    'filter_table_in_calculate': 5.0,
+    'iterator_over_filter': 4.0,
+    'nested_iterator': 3.0,
+    'all_on_fact_table': 3.0,
+}
+PATTERN_LABELS = {
+    'filter_table_in_calculate': 'FILTER over a whole table inside CALCULATE',
+    'iterator_over_filter': 'Iterator over FILTER',
+    'nested_iterator': 'Nested iterators',
+    'all_on_fact_table': 'ALL/ALLEXCEPT on a fact table',
+}
+DEPTH_WEIGHT = 0.5
+MAX_CACHE_ENTRIES = 50000
+
+FUNCTION_NAME_PATTERN = re.compile(r"([A-Za-z][A-Za-z0-9_.]*)\s*$")
+BARE_TABLE_PATTERN = re.compile(r"^\s*(?:'((?:[^']|'')+)'|([A-Za-z_]\w*))\s*$")
+
+# Findings per expression hash, shared by every analysis in the process
+_findings_cache: Dict[str, 'ExpressionFindings'] = {}
+_cache_lock = threading.Lock()
+
+
+class Call:
+    """A function call in a DAX expression with the spans of its arguments."""
+
+    __slots__ = ('name', 'start', 'end', 'args', 'parent')
+
+    def __init__(self, name: str, start: int, parent: Optional['Call']):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.args: List[Tuple[int, int]] = []
+        self.parent = parent
+
+    def ancestors(self):
+        call = self.parent
+        while call is not None:
+            yield call
+            call = call.parent
+
+    def argument_index(self, position: int) -> int:
+        for index, (start, end) in enumerate(self.args):
+            if start <= position < end:
+                return index
+        return -1
+
+
+def parse_calls(text: str) -> List[Call]:
+    """Finds every function call and the character span of each argument.
+
+    This is a bracket-matching scan rather than a full DAX parser; comments
+    and string literals must already be stripped.
+    """
+    calls: List[Call] = []
+    stack: List[Optional[Call]] = []
+    arg_start: List[int] = []
+    position = 0
+    length = len(text)
+    while position < length:
+        char = text[position]
+        if char == '(':
+            match = FUNCTION_NAME_PATTERN.search(text, max(0, position - 64), position)
+            call = None
+            if match:
+                parent = next((c for c in reversed(stack) if c is not None), None)
+                call = Call(match.group(1).upper(), match.start(), parent)
+                calls.append(call)
+            stack.append(call)
+            arg_start.append(position + 1)
+        elif char == ',' and stack:
+            if stack[-1] is not None:
+                stack[-1].args.append((arg_start[-1], position))
+            arg_start[-1] = position + 1
+        elif char == ')' and stack:
+            call = stack.pop()
+            start = arg_start.pop()
+            if call is not None:
+                call.args.append((start, position))
+                call.end = position + 1
+        elif char == '[':
+            closing = text.find(']', position)
+            position = closing if closing != -1 else length
+        elif char == "'":
+            # Quoted table names may contain brackets and commas; '' escapes a quote
+            closing = text.find("'", position + 1)
+            while closing != -1 and text.startswith("''", closing):
+                closing = text.find("'", closing + 2)
+            position = closing if closing != -1 else length
+        position += 1
+    return calls
+
+
+class ExpressionFindings:
+    """Pattern counts for one expression, independent of the model."""
+
+    __slots__ = ('counts', 'all_tables')
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.all_tables: List[str] = []
+
+    def add(self, pattern: str) -> None:
+        self.counts[pattern] = self.counts.get(pattern, 0) + 1
+
+
+def expression_hash(expression: str) -> str:
+    return hashlib.sha1(expression.encode('utf-8')).hexdigest()
+
+
+def _bare_table(text: str, span: Tuple[int, int]) -> Optional[str]:
+    match = BARE_TABLE_PATTERN.match(text[span[0]:span[1]])
+    if not match:
+        return None
+    return match.group(1).replace("''", "'") if match.group(1) else match.group(2)
+
+
+def analyze_expression(expression: str) -> ExpressionFindings:
+    """Detects expensive patterns in one DAX expression."""
+    text = strip_dax_noise(expression)
+    findings = ExpressionFindings()
+    for call in parse_calls(text):
+        if call.name == 'FILTER' and call.args and _bare_table(text, call.args[0]):
+            for ancestor in call.ancestors():
+                if ancestor.name in CALCULATE_FUNCTIONS:
+                    if ancestor.argument_index(call.start) > 0:
+                        findings.add('filter_table_in_calculate')
+                    break
+        if call.name in ITERATORS and call.name != 'FILTER':
+            if call.args:
+                first = text[call.args[0][0]:call.args[0][1]].lstrip().upper()
+                if first.startswith('FILTER'):
+                    findings.add('iterator_over_filter')
+        if call.name in ITERATORS:
+            parent = call.parent
+            if parent is not None and parent.name in ITERATORS and parent.argument_index(call.start) > 0:
+                findings.add('nested_iterator')
+        if call.name in ALL_FUNCTIONS and call.args:
+            table = _bare_table(text, call.args[0])
+            if table:
+                findings.all_tables.append(table)
+    return findings
+
+
+def cached_findings(expression: str) -> ExpressionFindings:
+    """Returns the findings for an expression, analysing it only if no
+    expression with the same hash has been seen before."""
+    key = expression_hash(expression)
+    with _cache_lock:
+        findings = _findings_cache.get(key)
+    if findings is None:
+        findings = analyze_expression(expression)
+        with _cache_lock:
+            if len(_findings_cache) >= MAX_CACHE_ENTRIES:
+                _findings_cache.clear()
+            _findings_cache[key] = findings
+    return findings
+
+
+def fact_tables(model: Model) -> Set[str]:
+    """Tables that are only ever on the many side of relationships."""
+    many_side = set()
+    one_side = set()
+    for relationship in model.relationships:
+        if relationship.from_cardinality == 'many':
+            many_side.add(relationship.from_table)
+        if relationship.to_cardinality == 'one':
+            one_side.add(relationship.to_table)
+    return many_side - one_side
+
+
+class DaxHotspotAnalyzer:
+    """Ranks measures by estimated evaluation cost.
+
+    Each measure's pattern findings are weighted by PATTERN_WEIGHTS, then
+    scaled by its transitive dependency depth and by its fan-in (how many
+    other measures and columns reference it) in the model lineage graph.
+    """
+
+    def __init__(self):
+        self.lineage = ModelLineage()
+        self.fact_tables: Set[str] = set()
+        self.results: List[Dict[str, Any]] = []
+
+    def process_model_data(self, model_data: Any) -> None:
+        model = decode_model(model_data)
+        if model is None:
+            return
+        self.lineage.process_model_data(model)
+        self.fact_tables = fact_tables(model)
+        depths = self._dependency_depths()
+
+        self.results = []
+        graph = self.lineage.graph
+        for key, measure in self.lineage.measures.items():
+            findings = cached_findings(measure['expression'])
+            counts = dict(findings.counts)
+            fact_all = sum(1 for table in findings.all_tables if table in self.fact_tables)
+            if fact_all:
+                counts['all_on_fact_table'] = fact_all
+            pattern_score = sum(PATTERN_WEIGHTS[pattern] * count for pattern, count in counts.items())
+            index = graph.index_of(key)
+            depth = depths[index]
+            fan_in = graph.out_degree(index)
+            score = (pattern_score + DEPTH_WEIGHT * depth) * (1 + math.log2(1 + fan_in))
+            self.results.append({
+                'measure': key,
+                'table': measure['table'],
+                'patterns': [PATTERN_LABELS[pattern] for pattern in sorted(counts)],
+                'pattern_count': sum(counts.values()),
+                'depth': depth,
+                'fan_in': fan_in,
+                'score': round(score, 2)
+            })
+
+    def _dependency_depths(self) -> List[int]:
+        """Longest chain of dependencies below each node.
+
+        Components come out of Tarjan's algorithm dependencies-last, so
+        walking them from the highest number down visits every dependency
+        before the nodes that use it; a cycle counts as one level.
+        """
+        graph = self.lineage.graph
+        component, count = graph.strongly_connected_components()
+        members: List[List[int]] = [[] for _ in range(count)]
+        for node, label in enumerate(component):
+            members[label].append(node)
+        component_depth = [0] * count
+        for label in range(count - 1, -1, -1):
+            depth = 0
+            for node in members[label]:
+                for dependency in graph.predecessors(node):
+                    if component[dependency] != label:
+                        depth = max(depth, component_depth[component[dependency]] + 1)
+            component_depth[label] = depth
+        return [component_depth[label] for label in component]
+
+    def report(self, sort: str = 'score', descending: bool = True) -> List[Dict[str, Any]]:
+        """Returns the results sorted by any result field."""
+        if sort not in ('measure', 'table', 'pattern_count', 'depth', 'fan_in', 'score'):
+            sort = 'score'
+        return sorted(self.results, key=lambda result: (result[sort], result['measure']), reverse=descending)
@@ -0,0 +1,268 @@
+import hashlib
+import random
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from .model_lineage import DAX_NOISE_PATTERN, expression_text
+from .model_schema import decode_model
+
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+# Buckets larger than this are skipped when listing pairs; they hold
+# boilerplate such as a bare SUM that every model repeats
+MAX_BUCKET_SIZE = 200
+MAX_REPORTED_PAIRS = 500
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1)
+PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                for _ in range(NUM_PERM)]
+
+TOKEN_PATTERN = re.compile(
+    r'"(?:[^"]|"")*"'             # string literal
+    r"|'(?:[^']|'')+'"            # quoted table name
+    r'|\[[^\]]*\]'                # column or measure
+    r'|[A-Za-z_][\w.]*'           # function, table, keyword or variable
+    r'|\d+(?:\.\d+)?'             # number
+    r'|&&|\|\||<=|>=|<>|==|\S'    # operators and punctuation
+)
+
+
+def normalize_dax(expression: Any) -> List[str]:
+    """Returns the tokens of a DAX expression in canonical form.
+
+    Comments and whitespace are dropped; identifiers, which DAX compares
+    case-insensitively, are lowercased; 'Quoted' and unquoted spellings of
+    a table name become the same token; and VAR names, the aliases an
+    expression gives its tables and values, are renamed by position, so
+    renaming a variable does not make two expressions differ.
+    """
+    # Comments are matched alongside strings so that // inside a string is kept
+    text = DAX_NOISE_PATTERN.sub(
+        lambda match: match.group(0) if match.group(0).startswith('"') else ' ',
+        expression_text(expression)
+    )
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text):
+        if token.startswith('"'):
+            tokens.append(token)
+        elif token.startswith("'"):
+            tokens.append(token[1:-1].replace("''", "'").lower())
+        else:
+            tokens.append(token.lower())
+
+    aliases: Dict[str, str] = {}
+    for position, token in enumerate(tokens[:-1]):
+        if token == 'var' and tokens[position + 1] not in aliases:
+            aliases[tokens[position + 1]] = f'_v{len(aliases) + 1}'
+    if aliases:
+        tokens = [aliases.get(token, token) for token in tokens]
+    return tokens
+
+
+def shingle_hashes(tokens: List[str]) -> Set[int]:
+    """32-bit hashes of every run of SHINGLE_SIZE consecutive tokens."""
+    if len(tokens) <= SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))}
+    return {
+        zlib.crc32(' '.join(tokens[i:i + SHINGLE_SIZE]).encode('utf-8'))
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(hashes: Iterable[int]) -> Tuple[int, ...]:
+    """MinHash signature of a shingle set: the minimum of each of the
+    NUM_PERM random permutations ``(a * x + b) mod p``."""
+    hashes = list(hashes)
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in PERMUTATIONS
+    )
+
+
+def estimated_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+class DaxExpression:
+    """One distinct normalized expression and every measure that uses it."""
+
+    __slots__ = ('digest', 'text', 'signature', 'measures')
+
+    def __init__(self, digest: str, text: str, signature: Tuple[int, ...]):
+        self.digest = digest
+        self.text = text
+        self.signature = signature
+        # (model id, model name, Table[Measure])
+        self.measures: List[Tuple[int, str, str]] = []
+
+
+class DaxSimilarityIndex:
+    """Incremental index of measure expressions across every stored model.
+
+    Measures are grouped by the hash of their normalized expression, which
+    finds exact duplicates directly. Each distinct expression is also
+    MinHashed and its signature split into BANDS bands; expressions that
+    share any band land in the same bucket, so near-duplicate candidates
+    come from bucket lookups instead of comparing every pair. With 16
+    bands of 4 rows, pairs above roughly 0.5 similarity become candidates.
+
+    Models are added and removed one at a time as they are uploaded and
+    replaced; nothing is rebuilt. The index is safe to share across threads.
+    """
+
+    def __init__(self, bands: int = BANDS):
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.expressions: Dict[str, DaxExpression] = {}
+        self.models: Dict[int, str] = {}
+        self._model_digests: Dict[int, Set[str]] = {}
+        # (model name, Table[Measure]) -> expression digest
+        self._measure_digests: Dict[Tuple[str, str], str] = {}
+        self._buckets: Dict[Tuple[int, int], Set[str]] = {}
+        self._lock = threading.RLock()
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, int]]:
+        return [(band, hash(signature[band * self.rows:(band + 1) * self.rows]))
+                for band in range(self.bands)]
+
+    def add_model(self, model_id: int, name: str, model_data: Any) -> int:
+        """Indexes every measure of a model (JSON text, a parsed dict or a
+        decoded Model) and returns how many were added."""
+        model = decode_model(model_data)
+        prepared = []
+        for table in model.tables if model else ():
+            for measure in table.measures:
+                tokens = normalize_dax(measure.expression)
+                if not tokens:
+                    continue
+                text = ' '.join(tokens)
+                key = f"{table.name}[{measure.name}]"
+                prepared.append((key, text, tokens))
+
+        with self._lock:
+            self.remove_model(model_id)
+            self.models[model_id] = name
+            digests = self._model_digests.setdefault(model_id, set())
+            for key, text, tokens in prepared:
+                digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+                expression = self.expressions.get(digest)
+                if expression is None:
+                    expression = DaxExpression(digest, text, minhash(shingle_hashes(tokens)))
+                    self.expressions[digest] = expression
+                    for band_key in self._band_keys(expression.signature):
+                        self._buckets.setdefault(band_key, set()).add(digest)
+                expression.measures.append((model_id, name, key))
+                self._measure_digests[(name, key)] = digest
+                digests.add(digest)
+        return len(prepared)
+
+    def remove_model(self, model_id: int) -> None:
+        with self._lock:
+            self.models.pop(model_id, None)
+            for digest in self._model_digests.pop(model_id, ()):
+                expression = self.expressions[digest]
+                remaining = []
+                for measure in expression.measures:
+                    if measure[0] == model_id:
+                        self._measure_digests.pop((measure[1], measure[2]), None)
+                    else:
+                        remaining.append(measure)
+                expression.measures = remaining
+                if expression.measures:
+                    continue
+                del self.expressions[digest]
+                for band_key in self._band_keys(expression.signature):
+                    bucket = self._buckets[band_key]
+                    bucket.discard(digest)
+                    if not bucket:
+                        del self._buckets[band_key]
+
+    def _candidates(self, expression: DaxExpression) -> Set[str]:
+        candidates = set()
+        for band_key in self._band_keys(expression.signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        candidates.discard(expression.digest)
+        return candidates
+
+    @staticmethod
+    def describe(expression: DaxExpression) -> Dict[str, Any]:
+        return {
+            'measures': [{'model': name, 'measure': key} for _, name, key in expression.measures],
+            'models': len({model_id for model_id, _, _ in expression.measures}),
+            'expression': expression.text
+        }
+
+    def duplicates(self, cross_model_only: bool = False) -> List[Dict[str, Any]]:
+        """Groups of measures whose normalized expressions are identical,
+        most widely copied first."""
+        with self._lock:
+            groups = [self.describe(expression) for expression in self.expressions.values()
+                      if len(expression.measures) > 1]
+        if cross_model_only:
+            groups = [group for group in groups if group['models'] > 1]
+        groups.sort(key=lambda group: (-group['models'], -len(group['measures'])))
+        return groups
+
+    def find(self, model_name: str, measure: str) -> Optional[DaxExpression]:
+        with self._lock:
+            digest = self._measure_digests.get((model_name, measure))
+            return self.expressions[digest] if digest else None
+
+    def similar(self, expression: DaxExpression,
+                threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+        """Distinct expressions estimated at least ``threshold`` similar to
+        ``expression``, looked up through its LSH buckets."""
+        results = []
+        with self._lock:
+            for digest in self._candidates(expression):
+                candidate = self.expressions[digest]
+                similarity = estimated_similarity(expression.signature, candidate.signature)
+                if similarity >= threshold:
+                    result = self.describe(candidate)
+                    result['similarity'] = round(similarity, 3)
+                    results.append(result)
+        results.sort(key=lambda result: -result['similarity'])
+        return results
+
+    def near_duplicates(self, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+        """Pairs of distinct expressions estimated at least ``threshold``
+        similar, most similar first, capped at MAX_REPORTED_PAIRS."""
+        pairs: Dict[Tuple[str, str], float] = {}
+        with self._lock:
+            for bucket in self._buckets.values():
+                if len(bucket) < 2 or len(bucket) > MAX_BUCKET_SIZE:
+                    continue
+                members = sorted(bucket)
+                for i, first in enumerate(members):
+                    for second in members[i + 1:]:
+                        if (first, second) in pairs:
+                            continue
+                        pairs[(first, second)] = estimated_similarity(
+                            self.expressions[first].signature, self.expressions[second].signature
+                        )
+            matches = sorted(
+                ((similarity, first, second) for (first, second), similarity in pairs.items()
+                 if similarity >= threshold),
+                key=lambda match: -match[0]
+            )
+            reported = [{
+                'similarity': round(similarity, 3),
+                'first': self.describe(self.expressions[first]),
+                'second': self.describe(self.expressions[second])
+            } for similarity, first, second in matches[:MAX_REPORTED_PAIRS]]
+        return {'pair_count': len(matches), 'pairs': reported}
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'models': len(self.models),
+                'measures': sum(len(e.measures) for e in self.expressions.values()),
+                'distinct_expressions': len(self.expressions),
+                'buckets': len(self._buckets)
+            }
@@ -0,0 +1,99 @@
+import csv
+import importlib.util
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+_pyarrow = None
+
+ROWS_PER_CHUNK = 500
+ARROW_BATCH_SIZE = 10000
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+
+def arrow_available() -> bool:
+    """Whether pyarrow (the optional ``arrow`` extra) is installed, found
+    without importing it."""
+    return _pyarrow is not None or importlib.util.find_spec('pyarrow') is not None
+
+
+def get_pyarrow():
+    """Imports pyarrow on first use, so starting the app does not load it."""
+    global _pyarrow
+    if _pyarrow is None:
+        import pyarrow
+        _pyarrow = pyarrow
+    return _pyarrow
+
+
+def _drain(buffer: io.BytesIO) -> bytes:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def stream_csv(columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yields a CSV document in chunks of ROWS_PER_CHUNK rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([row.get(column, '') for column in columns])
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_jsonl(columns: List[str], rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yields one JSON object per line, restricted to ``columns``."""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({column: row.get(column, '') for column in columns}) + '\n')
+        if len(chunk) == ROWS_PER_CHUNK:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def stream_arrow(columns: List[str], rows: Iterable[Dict[str, Any]],
+                 batch_size: int = ARROW_BATCH_SIZE) -> Iterator[bytes]:
+    """Yields an Arrow IPC stream of string columns, one record batch at a
+    time, so no more than ``batch_size`` rows are held in memory."""
+    if not arrow_available():
+        raise RuntimeError('Arrow export requires pyarrow (pip install .[arrow])')
+    pa = get_pyarrow()
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    batch: Dict[str, List[str]] = {column: [] for column in columns}
+    size = 0
+    for row in rows:
+        for column in columns:
+            value = row.get(column, '')
+            batch[column].append(value if isinstance(value, str) else str(value))
+        size += 1
+        if size == batch_size:
+            writer.write_batch(pa.RecordBatch.from_pydict(batch, schema=schema))
+            yield _drain(sink)
+            batch = {column: [] for column in columns}
+            size = 0
+    if size:
+        writer.write_batch(pa.RecordBatch.from_pydict(batch, schema=schema))
+    writer.close()
+    yield _drain(sink)
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+    'arrow': stream_arrow,
+}
@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import os
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Buffered responses only: static files are sent as direct passthrough and
+# exports are streamed, so neither goes through compress_response
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/plain',
+    'application/json',
+}
+MIN_COMPRESS_SIZE = 500
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Static URLs carrying the current ?v= fingerprint never change content
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+_static_versions: Dict[str, str] = {}
+
+
+def directory_version(path: str, suffix: str = '.html') -> str:
+    """Hashes the contents of every matching file in ``path``, so the value
+    changes whenever a template is edited and deployed."""
+    digest = hashlib.sha1()
+    for name in sorted(os.listdir(path)):
+        if name.endswith(suffix):
+            digest.update(name.encode('utf-8'))
+            with open(os.path.join(path, name), 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()[:12]
+
+
+def tree_version(path: str) -> str:
+    """Hashes the contents of every file under ``path``, recursively. Pages
+    embed static fingerprints, so this is part of their ETags."""
+    digest = hashlib.sha1()
+    for root, directories, files in os.walk(path):
+        directories.sort()
+        for name in sorted(files):
+            full_path = os.path.join(root, name)
+            digest.update(os.path.relpath(full_path, path).encode('utf-8'))
+            with open(full_path, 'rb') as file:
+                digest.update(file.read())
+    return digest.hexdigest()[:12]
+
+
+def make_etag(parts: Iterable[Optional[str]]) -> str:
+    """Combines content hashes, template and static versions and the URL
+    into one ETag."""
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update((part or '-').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def static_version(static_folder: str, filename: str) -> str:
+    """Short content hash of a static file, used as a cache-busting query
+    parameter so static files can be cached for a long time. The file is
+    only re-read when its mtime or size changes."""
+    path = os.path.join(static_folder, filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ''
+    cache_key = f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+    if cache_key not in _static_versions:
+        try:
+            with open(path, 'rb') as file:
+                _static_versions[cache_key] = hashlib.sha1(file.read()).hexdigest()[:10]
+        except OSError:
+            return ''
+    return _static_versions[cache_key]
+
+
+def cache_static_response(response, static_folder: str, filename: str, version: Optional[str]):
+    """Gives a static response a long max-age, but only when the request
+    carries the file's current fingerprint; other static URLs revalidate."""
+    if (response.status_code in (200, 304) and version
+            and version == static_version(static_folder, filename)):
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+    return response
+
+
+def choose_encoding(accept_encoding) -> Optional[str]:
+    """Picks brotli when the client and server support it, else gzip."""
+    if brotli is not None and accept_encoding['br']:
+        return 'br'
+    if accept_encoding['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, accept_encoding):
+    """Compresses a buffered text response in place when worthwhile."""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
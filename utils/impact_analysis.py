@@ -0,0 +1,169 @@
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Union
+from .data_processor import FIELD_COLUMNS, DataProcessor
+from .model_lineage import ModelLineage
+
+logger = logging.getLogger(__name__)
+
+IMPACT_TYPES = ('column', 'measure', 'visual', 'page')
+# A bitset costs one bit per position up to its highest member, a sorted
+# array 64 bits per member; each reach set uses whichever is smaller
+BITS_PER_ARRAY_ITEM = 64
+
+Reach = Union[int, array]
+
+
+def positions_to_bits(positions: Iterable[int]) -> int:
+    """Builds a bitset from component numbers in one allocation."""
+    positions = list(positions)
+    if not positions:
+        return 0
+    buffer = bytearray((max(positions) >> 3) + 1)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bits_to_positions(bits: int) -> List[int]:
+    positions: List[int] = []
+    digits = bin(bits)[:1:-1]
+    position = digits.find('1')
+    while position != -1:
+        positions.append(position)
+        position = digits.find('1', position + 1)
+    return positions
+
+
+class ImpactAnalyzer:
+    """Answers "what breaks if I change X" across the model and the report.
+
+    The model lineage (columns -> measures) is joined with the report's
+    visual field references (fields -> visuals -> pages) into one graph.
+    At analysis time the graph is condensed into strongly connected
+    components and every component gets the set of other components it
+    reaches, so an impact query is a single lookup plus decoding the set.
+    """
+
+    def __init__(self):
+        self.lineage = ModelLineage()
+        self.graph = self.lineage.graph
+        self._component = array('l')
+        self._members: List[List[int]] = []
+        self._reach: List[Reach] = []
+
+    def process(self, model_content: Any, report_content: Optional[str] = None) -> None:
+        """Builds the joined graph and precomputes the reachability index."""
+        self.lineage.process_model_data(model_content)
+        if report_content:
+            processor = DataProcessor()
+            processor.process_json(report_content)
+            self._add_report_fields(processor.visuals_data)
+        self._build_reachability_index()
+
+    def _add_report_fields(self, visuals_data: List[List[str]]) -> None:
+        """Adds visual and page nodes fed by the fields each row references."""
+        for position, row in enumerate(visuals_data):
+            if len(row) < 3:
+                continue
+            page_name, visual_type, visual_name = row[0], row[1], row[2]
+            page_id = f"page:{page_name}"
+            visual_id = f"visual:{page_name}/{visual_name or visual_type}#{position}"
+            self.graph.add_node(page_id, type='page')
+            self.graph.add_node(visual_id, type='visual')
+            self.graph.add_edge(visual_id, page_id)
+            for index in FIELD_COLUMNS:
+                if index < len(row) and row[index]:
+                    for field in row[index].split('; '):
+                        if field:
+                            self.graph.add_edge(field.strip(), visual_id)
+
+    def _build_reachability_index(self) -> None:
+        """Computes the components reachable from every component.
+
+        Components come out of Tarjan's algorithm in reverse topological
+        order, so one forward pass sees every successor before its
+        predecessors. A component's own number is not part of its set.
+        Each set is stored as a bitset over component numbers when it is
+        dense, and as a sorted array('l') when it is sparse; an upstream
+        column with a high component number that reaches a handful of
+        visuals then costs a few array items, not a bitset as wide as the
+        graph. Memory is bounded by the total size of the reach sets.
+        """
+        self._component, count = self.graph.strongly_connected_components()
+        self._members = [[] for _ in range(count)]
+        for node, component in enumerate(self._component):
+            self._members[component].append(node)
+
+        reach: List[Reach] = [0] * count
+        for component in range(count):
+            bits = 0
+            positions = set()
+            for node in self._members[component]:
+                for child in self.graph.successors(node):
+                    child_component = self._component[child]
+                    if child_component == component or child_component in positions:
+                        continue
+                    positions.add(child_component)
+                    child_reach = reach[child_component]
+                    if isinstance(child_reach, int):
+                        bits |= child_reach
+                    else:
+                        positions.update(child_reach)
+            if bits:
+                bits |= positions_to_bits(positions)
+                size, width = bits.bit_count(), bits.bit_length()
+            else:
+                size, width = len(positions), max(positions, default=-1) + 1
+            if size * BITS_PER_ARRAY_ITEM < width:
+                reach[component] = array('l', sorted(bits_to_positions(bits) if bits else positions))
+            else:
+                reach[component] = bits or positions_to_bits(positions)
+        self._reach = reach
+
+    def _reached_components(self, component: int) -> Iterable[int]:
+        reach = self._reach[component]
+        return bits_to_positions(reach) if isinstance(reach, int) else reach
+
+    def _decode(self, component: int) -> List[int]:
+        """Expands a component's reach set into node indexes, including the
+        other members of the component itself."""
+        nodes: List[int] = list(self._members[component])
+        for reached in self._reached_components(component):
+            nodes.extend(self._members[reached])
+        return nodes
+
+    def impact(self, object_id: str) -> Dict[str, List[str]]:
+        """Returns every downstream column, measure, visual and page of
+        ``object_id`` (a ``Table[Column]`` or ``Table[Measure]`` key)."""
+        result: Dict[str, List[str]] = {kind: [] for kind in IMPACT_TYPES}
+        index = self.graph.index_of(object_id)
+        if index is None:
+            return result
+        component = self._component[index]
+        for node in self._decode(component):
+            record = self.graph.records[node]
+            if node == index or record.type not in result:
+                continue
+            label = record.label
+            if record.type in ('page', 'visual'):
+                label = label.split(':', 1)[1]
+            result[record.type].append(label)
+        return result
+
+    def affects(self, object_id: str, target_id: str) -> bool:
+        """Returns True if changing ``object_id`` reaches ``target_id``."""
+        source = self.graph.index_of(object_id)
+        target = self.graph.index_of(target_id)
+        if source is None or target is None or source == target:
+            return False
+        source_component = self._component[source]
+        target_component = self._component[target]
+        if source_component == target_component:
+            return True
+        reach = self._reach[source_component]
+        if isinstance(reach, int):
+            return bool(reach >> target_component & 1)
+        position = bisect_left(reach, target_component)
+        return position < len(reach) and reach[position] == target_component
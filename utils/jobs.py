@@ -0,0 +1,258 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; there every unfinished job is treated as interrupted
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED_STATES = {SUCCEEDED, FAILED}
+
+# Finished jobs stay in memory this long for polling, then are read from disk
+MEMORY_RETENTION = 300
+# How often submit looks for job files older than the retention period
+PRUNE_INTERVAL = 600
+
+
+class JobRunner:
+    """Runs upload processing in a local worker pool.
+
+    Each job's status is kept in memory for fast polling and written to
+    ``<jobs_dir>/<job id>.json`` on every change, so status survives a
+    restart and can be listed per model. Job functions receive a
+    ``progress(percent, message)`` callback as their first argument.
+
+    Each runner holds a lock on ``<jobs_dir>/<runner id>.lock`` while its
+    process lives. On startup, unfinished jobs whose runner no longer holds
+    its lock were cut off by a restart and are marked failed; jobs of
+    runners in other live worker processes are left alone.
+
+    Finished jobs are dropped from memory after ``MEMORY_RETENTION``
+    seconds, and their files are deleted once they are older than
+    ``retention`` seconds, so neither grows without bound.
+    """
+
+    def __init__(self, jobs_dir: str, max_workers: int = 2, retention: float = 7 * 24 * 3600):
+        self.jobs_dir = jobs_dir
+        self.retention = retention
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Job files as last read by for_model: file name -> (mtime_ns, record)
+        self._files: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._changed = threading.Condition()
+        self.runner_id = uuid.uuid4().hex
+        self._lock_file = self._hold_lock()
+        self._fail_interrupted()
+        self._prune_files()
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _lock_path(self, runner_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{runner_id}.lock")
+
+    def _hold_lock(self):
+        if fcntl is None:
+            return None
+        file = open(self._lock_path(self.runner_id), 'w')
+        fcntl.flock(file, fcntl.LOCK_EX)
+        return file
+
+    def _runner_alive(self, runner_id: Optional[str]) -> bool:
+        """True while the runner's process holds its lock; the OS releases
+        it when the process exits, however it exits."""
+        if fcntl is None or not runner_id:
+            return False
+        try:
+            with open(self._lock_path(runner_id), 'r') as file:
+                fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        try:
+            os.remove(self._lock_path(runner_id))
+        except OSError:  # another worker starting at the same time removed it
+            pass
+        return False
+
+    def _fail_interrupted(self) -> None:
+        """Marks jobs left pending or running by an exited process as failed,
+        so their status pages and event streams finish, and removes the lock
+        files of exited runners."""
+        filenames = os.listdir(self.jobs_dir)
+        alive = {
+            filename[:-len('.lock')]: self._runner_alive(filename[:-len('.lock')])
+            for filename in filenames
+            if filename.endswith('.lock') and filename[:-len('.lock')] != self.runner_id
+        }
+        for filename in filenames:
+            if not filename.endswith('.json'):
+                continue
+            job = self.get(filename[:-len('.json')])
+            if not job or job['status'] in FINISHED_STATES or alive.get(job.get('runner')):
+                continue
+            job.update(status=FAILED, error='Interrupted by a restart', message='Interrupted', updated_at=time.time())
+            self._save(job)
+            logger.warning(f"Job {job['id']} was interrupted by a restart")
+
+    def _prune_files(self) -> None:
+        """Deletes the files of finished jobs last updated more than
+        ``retention`` seconds ago. Only files that old are opened."""
+        self._pruned_at = time.monotonic()
+        cutoff = time.time() - self.retention
+        for filename in os.listdir(self.jobs_dir):
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.jobs_dir, filename)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                with open(path, 'r', encoding='utf-8') as file:
+                    job = json.load(file)
+                if job['status'] in FINISHED_STATES:
+                    os.remove(path)
+            except (OSError, ValueError, KeyError):  # removed by another worker, or half written
+                continue
+
+    def _evict_finished(self) -> None:
+        """Drops jobs that finished more than MEMORY_RETENTION seconds ago
+        from memory; ``get`` reads them from disk from then on."""
+        cutoff = time.time() - MEMORY_RETENTION
+        with self._changed:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job['status'] in FINISHED_STATES and job['updated_at'] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _save(self, job: Dict[str, Any]) -> None:
+        path = self._path(job['id'])
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as file:
+            json.dump(job, file)
+        os.replace(f"{path}.tmp", path)
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        with self._changed:
+            job = self._jobs[job_id]
+            job.update(fields, updated_at=time.time())
+            self._save(job)
+            self._changed.notify_all()
+
+    def submit(self, name: str, func: Callable[..., Any], *args: Any, model: Optional[str] = None) -> Dict[str, Any]:
+        """Queues ``func(progress, *args)`` and returns the new job record."""
+        self._evict_finished()
+        if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL:
+            self._prune_files()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        job = {
+            'id': job_id,
+            'name': name,
+            'model': model,
+            'runner': self.runner_id,
+            'status': PENDING,
+            'progress': 0,
+            'message': 'Queued',
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        }
+        with self._changed:
+            self._jobs[job_id] = job
+            self._save(job)
+        self._executor.submit(self._run, job_id, func, args)
+        return dict(job)
+
+    def _run(self, job_id: str, func: Callable[..., Any], args: tuple) -> None:
+        def progress(percent: int, message: str = '') -> None:
+            self._update(job_id, progress=max(0, min(100, int(percent))), message=message)
+
+        self._update(job_id, status=RUNNING, message='Started')
+        try:
+            result = func(progress, *args)
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            self._update(job_id, status=FAILED, error=str(e), message='Failed')
+        else:
+            self._update(job_id, status=SUCCEEDED, progress=100, result=result, message='Done')
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Returns a copy of a job record, reading it from disk if this
+        process did not run the job."""
+        with self._changed:
+            if job_id in self._jobs:
+                return dict(self._jobs[job_id])
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def for_model(self, model: str) -> List[Dict[str, Any]]:
+        """Returns every persisted job for a model, newest first.
+
+        Jobs of this runner come from memory; other job files are only
+        re-read when their modification time changes.
+        """
+        files: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        jobs = []
+        for filename in os.listdir(self.jobs_dir):
+            if not filename.endswith('.json'):
+                continue
+            job_id = filename[:-len('.json')]
+            with self._changed:
+                job = dict(self._jobs[job_id]) if job_id in self._jobs else None
+            if job is None:
+                try:
+                    mtime = os.stat(os.path.join(self.jobs_dir, filename)).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self._files.get(filename)
+                if cached and cached[0] == mtime:
+                    job = cached[1]
+                else:
+                    job = self.get(job_id)
+                    if job is None:
+                        continue
+                files[filename] = (mtime, job)
+                job = dict(job)
+            if job.get('model') == model:
+                jobs.append(job)
+        self._files = files
+        return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+    def watch(self, job_id: str, timeout: float = 300.0) -> Iterator[Dict[str, Any]]:
+        """Yields the job record each time it changes, until it finishes or
+        ``timeout`` seconds pass without the job finishing."""
+        deadline = time.monotonic() + timeout
+        last_seen = None
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                return
+            if job['updated_at'] != last_seen:
+                last_seen = job['updated_at']
+                yield job
+            if job['status'] in FINISHED_STATES or job_id not in self._jobs:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            with self._changed:
+                current = self._jobs.get(job_id)
+                if current is not None and current['updated_at'] == last_seen:
+                    self._changed.wait(min(remaining, 15.0))
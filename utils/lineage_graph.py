@@ -0,0 +1,302 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Edge kinds are stored as small integers; index 0 means "no type".
+EDGE_KINDS: List[Optional[str]] = [None, 'depends_on']
+
+
+class NodeRecord:
+    """Compact per-node record; the node id is the position in the graph."""
+
+    __slots__ = ('label', 'type', 'dax')
+
+    def __init__(self, label: str, type: Optional[str] = None, dax: Optional[str] = None):
+        self.label = label
+        self.type = type
+        self.dax = dax
+
+
+class LineageGraph:
+    """Integer-indexed lineage graph with CSR adjacency in typed arrays.
+
+    Node ids are interned to integers on insertion. Edges are kept as two
+    parallel arrays until ``freeze`` drops duplicates and builds the
+    forward and reverse CSR (offsets/targets) arrays used for traversal. Dicts are only produced
+    by ``node_dicts``/``edge_dicts`` when serializing for templates.
+    """
+
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.records: List[NodeRecord] = []
+        self._declared = bytearray()
+        self._declared_order = array('l')
+        self._edge_src = array('l')
+        self._edge_dst = array('l')
+        self._edge_kind = array('b')
+        self._out_offsets: Optional[array] = None
+        self._out_targets: Optional[array] = None
+        self._in_offsets: Optional[array] = None
+        self._in_targets: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._index
+
+    @property
+    def edge_count(self) -> int:
+        self.freeze()
+        return len(self._edge_src)
+
+    def index_of(self, node_id: str) -> Optional[int]:
+        """Returns the integer index of a node id, or None if unknown."""
+        return self._index.get(node_id)
+
+    def node_id(self, index: int) -> str:
+        """Returns the string id of the node at ``index``."""
+        return self.records[index].label
+
+    def add_node(self, node_id: str, type: Optional[str] = None, dax: Optional[str] = None,
+                 declare: bool = True) -> int:
+        """Interns a node and returns its index. Existing declared nodes
+        keep their type, and only pick up a DAX expression if they had none.
+
+        Nodes interned with ``declare=False`` (edge endpoints nobody added
+        explicitly) take part in traversal but are not serialized.
+        """
+        index = self._index.get(node_id)
+        if index is None:
+            index = len(self.records)
+            self._index[node_id] = index
+            self.records.append(NodeRecord(node_id, type, dax))
+            self._declared.append(1 if declare else 0)
+            if declare:
+                self._declared_order.append(index)
+            self._invalidate()
+            return index
+        record = self.records[index]
+        if declare and not self._declared[index]:
+            self._declared[index] = 1
+            self._declared_order.append(index)
+            record.type = type
+        if dax is not None and record.dax is None:
+            record.dax = dax
+        return index
+
+    def iter_nodes(self) -> Iterator[NodeRecord]:
+        """Yields the records of explicitly added nodes in the order they
+        were declared."""
+        records = self.records
+        for index in self._declared_order:
+            yield records[index]
+
+    def add_edge(self, source: str, target: str, kind: Optional[str] = None) -> None:
+        """Adds an edge, interning unknown endpoints. Repeated edges are
+        dropped by ``freeze``; the first one added keeps its kind."""
+        src = self.add_node(source, declare=False)
+        dst = self.add_node(target, declare=False)
+        self._edge_src.append(src)
+        self._edge_dst.append(dst)
+        self._edge_kind.append(EDGE_KINDS.index(kind))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._out_offsets = None
+
+    @staticmethod
+    def _build_csr(size: int, keys: array, values: array) -> Tuple[array, array]:
+        """Counting-sort edges by ``keys`` into CSR offsets and targets."""
+        offsets = array('l', bytes(array('l').itemsize * (size + 1)))
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+        cursor = array('l', offsets[:size])
+        targets = array('l', bytes(array('l').itemsize * len(keys)))
+        for key, value in zip(keys, values):
+            targets[cursor[key]] = value
+            cursor[key] += 1
+        return offsets, targets
+
+    def _drop_duplicate_edges(self, size: int) -> None:
+        """Removes repeated (source, target) pairs, keeping the first in
+        insertion order.
+
+        Edge positions are bucketed by source with the same counting sort
+        as the CSR (which is stable), then each row is scanned once with a
+        per-target stamp of the last row that saw it.
+        """
+        src, dst = self._edge_src, self._edge_dst
+        offsets, positions = self._build_csr(size, src, array('l', range(len(src))))
+        seen = array('l', [-1]) * size
+        keep = bytearray(b'\x01') * len(src)
+        duplicates = 0
+        for row in range(size):
+            start, end = offsets[row], offsets[row + 1]
+            if end - start < 2:
+                continue
+            for position in positions[start:end]:
+                target = dst[position]
+                if seen[target] == row:
+                    keep[position] = 0
+                    duplicates += 1
+                else:
+                    seen[target] = row
+        if not duplicates:
+            return
+        kinds = self._edge_kind
+        self._edge_src = array('l', (v for v, k in zip(src, keep) if k))
+        self._edge_dst = array('l', (v for v, k in zip(dst, keep) if k))
+        self._edge_kind = array('b', (v for v, k in zip(kinds, keep) if k))
+
+    def freeze(self) -> None:
+        """Builds forward and reverse CSR adjacency if it is stale."""
+        if self._out_offsets is not None:
+            return
+        size = len(self.records)
+        self._drop_duplicate_edges(size)
+        self._out_offsets, self._out_targets = self._build_csr(size, self._edge_src, self._edge_dst)
+        self._in_offsets, self._in_targets = self._build_csr(size, self._edge_dst, self._edge_src)
+
+    def successors(self, index: int) -> array:
+        """Returns the direct successors of a node as an array slice."""
+        self.freeze()
+        return self._out_targets[self._out_offsets[index]:self._out_offsets[index + 1]]
+
+    def predecessors(self, index: int) -> array:
+        """Returns the direct predecessors of a node as an array slice."""
+        self.freeze()
+        return self._in_targets[self._in_offsets[index]:self._in_offsets[index + 1]]
+
+    def out_degree(self, index: int) -> int:
+        self.freeze()
+        return self._out_offsets[index + 1] - self._out_offsets[index]
+
+    def in_degree(self, index: int) -> int:
+        self.freeze()
+        return self._in_offsets[index + 1] - self._in_offsets[index]
+
+    def reachable(self, sources: Iterable[int], reverse: bool = False) -> List[int]:
+        """Returns every node reachable from ``sources`` (excluding them
+        unless reached through a cycle).
+
+        Traversal is level-synchronous: each frontier is expanded by slicing
+        whole CSR target ranges at once rather than visiting edges one by one.
+        """
+        self.freeze()
+        offsets = self._in_offsets if reverse else self._out_offsets
+        targets = self._in_targets if reverse else self._out_targets
+        visited = bytearray(len(self.records))
+        reached: List[int] = []
+        frontier = list(sources)
+        while frontier:
+            candidates = array('l')
+            for node in frontier:
+                candidates.extend(targets[offsets[node]:offsets[node + 1]])
+            frontier = []
+            for node in candidates:
+                if not visited[node]:
+                    visited[node] = 1
+                    frontier.append(node)
+            reached.extend(frontier)
+        return reached
+
+    def strongly_connected_components(self) -> Tuple[array, int]:
+        """Labels each node with its strongly connected component.
+
+        Iterative Tarjan's algorithm over the forward CSR arrays. Components
+        are numbered in the order Tarjan emits them, which is a reverse
+        topological order: every edge between components goes from a higher
+        component number to a lower one. Returns (labels, component count).
+        """
+        self.freeze()
+        offsets, targets = self._out_offsets, self._out_targets
+        size = len(self.records)
+        unvisited = -1
+        order = array('l', [unvisited]) * size
+        lowlink = array('l', [0]) * size
+        component = array('l', [unvisited]) * size
+        on_stack = bytearray(size)
+        stack: List[int] = []
+        counter = 0
+        components = 0
+        for root in range(size):
+            if order[root] != unvisited:
+                continue
+            order[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, offsets[root])]
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    child = targets[edge]
+                    if order[child] == unvisited:
+                        order[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = 1
+                        work.append((child, offsets[child]))
+                    elif on_stack[child] and order[child] < lowlink[node]:
+                        lowlink[node] = order[child]
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component[member] = components
+                        if member == node:
+                            break
+                    components += 1
+        return component, components
+
+    def descendants(self, node_id: str) -> List[str]:
+        """Returns the ids of every node downstream of ``node_id``."""
+        index = self._index.get(node_id)
+        if index is None:
+            return []
+        return [self.records[i].label for i in self.reachable([index])]
+
+    def ancestors(self, node_id: str) -> List[str]:
+        """Returns the ids of every node upstream of ``node_id``."""
+        index = self._index.get(node_id)
+        if index is None:
+            return []
+        return [self.records[i].label for i in self.reachable([index], reverse=True)]
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """Yields edges as (from, to, kind) tuples in insertion order."""
+        self.freeze()
+        records = self.records
+        for src, dst, kind in zip(self._edge_src, self._edge_dst, self._edge_kind):
+            yield records[src].label, records[dst].label, EDGE_KINDS[kind]
+
+    def node_dicts(self) -> List[Dict[str, str]]:
+        """Serializes nodes to the dict shape the templates expect."""
+        nodes = []
+        for record in self.iter_nodes():
+            node = {'id': record.label, 'label': record.label}
+            if record.type is not None:
+                node['type'] = record.type
+            if record.dax is not None:
+                node['dax'] = record.dax
+            nodes.append(node)
+        return nodes
+
+    def edge_dicts(self) -> List[Dict[str, str]]:
+        """Serializes edges to the dict shape the templates expect."""
+        edges = []
+        for source, target, kind in self.iter_edges():
+            edge = {'from': source, 'to': target}
+            if kind is not None:
+                edge['type'] = kind
+            edges.append(edge)
+        return edges
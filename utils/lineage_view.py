@@ -1,19 +1,18 @@
 import csv
 import logging
-import json
-from typing import Set, Dict, List, Optional, Tuple
+from typing import Any, Set, Dict, Iterator, List, Optional, Tuple
+from .lineage_graph import LineageGraph
+from .model_lineage import expression_text
+from .model_schema import Model, decode_model
 
 logger = logging.getLogger(__name__)
 
 class LineageView:
     def __init__(self, tsv_file_path: Optional[str] = None):
         self.tsv_file_path = tsv_file_path
-        self.nodes: List[Dict[str, str]] = []
-        self.edges: List[Dict[str, str]] = []
+        self.graph = LineageGraph()
         self.measure_dependencies: Dict[str, Set[str]] = {}
         self.dax_expressions: Dict[str, str] = {}
-        self.unique_edges: Set[Tuple[str, str]] = set()
-        self.unique_columns: Set[str] = set()
         self.measure_index = 0
         self.dax_expression_index = 1
         self.parent_index = 2
@@ -23,6 +22,21 @@ class LineageView:
         if tsv_file_path:
             self.process_lineage_data()
 
+    @property
+    def nodes(self) -> List[Dict[str, str]]:
+        """Node dicts for templates, serialized from the compact graph."""
+        return self.graph.node_dicts()
+
+    @property
+    def edges(self) -> List[Dict[str, str]]:
+        """Edge dicts for templates, serialized from the compact graph."""
+        return self.graph.edge_dicts()
+
+    def iter_edges(self) -> Iterator[Dict[str, str]]:
+        """Yields lineage edges one at a time as {'from', 'to', 'type'} dicts."""
+        for source, target, kind in self.graph.iter_edges():
+            yield {'from': source, 'to': target, 'type': kind or ''}
+
     def process_lineage_data(self, data: Optional[List[List[str]]] = None) -> None:
         """Processes the lineage data to extract nodes and edges for the lineage graph."""
         if data is None and self.tsv_file_path:
@@ -43,11 +57,7 @@ class LineageView:
                 continue
 
             measure_name = measure[self.measure_index]
-            self.nodes.append({
-                'id': measure_name,
-                'label': measure_name,
-                'dax': measure[self.dax_expression_index]
-            })
+            self.graph.add_node(measure_name, dax=measure[self.dax_expression_index])
 
             parent_measures = measure[self.parent_index].split('; ') if measure[self.parent_index] else []
             measure_columns = measure[self.column_index].split('; ') if measure[self.column_index] else []
@@ -55,46 +65,33 @@ class LineageView:
             # Process columns
             for column in measure_columns:
                 if column:
-                    if column not in self.unique_columns:
-                        self.nodes.append({
-                            'id': column,
-                            'label': column,
-                            'type': 'column'
-                        })
-                        self.unique_columns.add(column)
-
-                    edge = (column, measure_name)
-                    if edge not in self.unique_edges:
-                        self.unique_edges.add(edge)
-                        self.edges.append({'from': column, 'to': measure_name})
+                    self.graph.add_node(column, type='column')
+                    self.graph.add_edge(column, measure_name)
 
             # Process parent-child relationships
             for parent in parent_measures:
                 if parent:
-                    edge = (parent, measure_name)
-                    if edge not in self.unique_edges:
-                        self.unique_edges.add(edge)
-                        self.edges.append({'from': parent, 'to': measure_name})
+                    self.graph.add_edge(parent, measure_name)
 
-    def process_model_data(self, model_data: Dict) -> None:
-        """Process model data to extract measure dependencies and DAX expressions"""
-        if not isinstance(model_data, dict):
-            model_data = json.loads(model_data)
+    def process_model_data(self, model_data: Any) -> None:
+        """Process model data (JSON text, a parsed dict or a decoded Model)
+        to extract measure dependencies and DAX expressions"""
+        model = decode_model(model_data)
+        if model is None:
+            return
 
-        self._extract_measures(model_data)
+        self._extract_measures(model)
         self._build_dependency_graph()
 
-    def _extract_measures(self, model_data: Dict) -> None:
+    def _extract_measures(self, model: Model) -> None:
         """Extract measures and their DAX expressions from model data"""
-        if 'model' not in model_data:
-            return
+        for table in model.tables:
+            table_name = table.name
+            for measure in table.measures:
+                measure_name = measure.name
+                # model.json stores multi-line expressions as a list of lines
+                expression = expression_text(measure.expression)
 
-        for table in model_data['model'].get('tables', []):
-            table_name = table.get('name', '')
-            for measure in table.get('measures', []):
-                measure_name = measure.get('name', '')
-                expression = measure.get('expression', '')
-                
                 if measure_name and expression:
                     self.dax_expressions[f"{table_name}[{measure_name}]"] = expression
                     self._analyze_dax_dependencies(table_name, measure_name, expression)
@@ -117,36 +114,26 @@ class LineageView:
     def _build_dependency_graph(self) -> None:
         """Build nodes and edges for visualization"""
         for measure in self.measure_dependencies.keys():
-            if not any(node['id'] == measure for node in self.nodes):
-                self.nodes.append({
-                    'id': measure,
-                    'label': measure,
-                    'type': 'measure'
-                })
-        
+            self.graph.add_node(measure, type='measure', dax=self.dax_expressions.get(measure))
+
         for measure, dependencies in self.measure_dependencies.items():
             for dep in dependencies:
-                edge = (measure, dep)
-                if edge not in self.unique_edges:
-                    self.unique_edges.add(edge)
-                    self.edges.append({
-                        'from': measure,
-                        'to': dep,
-                        'type': 'depends_on'
-                    })
+                self.graph.add_edge(measure, dep, kind='depends_on')
 
     def extract_dax_expressions(self) -> List[Tuple[str, str]]:
         """Extracts DAX expressions for each measure."""
-        dax_expressions = []
-        for measure in self.nodes:
-            if 'label' in measure and measure.get('type') != 'column':
-                label = measure['label'].strip()
+        return list(self.iter_dax_expressions())
+
+    def iter_dax_expressions(self) -> Iterator[Tuple[str, str]]:
+        """Yields (measure, DAX expression) pairs one at a time."""
+        for measure in self.graph.iter_nodes():
+            if measure.type != 'column':
+                label = measure.label.strip()
                 if label:
-                    dax_expression = measure.get('dax', '')
+                    dax_expression = measure.dax
                     if dax_expression:
                         dax_expression = dax_expression.replace('\\n', '\n').replace('\\t', '\t').replace('\\r', '\r')
-                        dax_expressions.append((label, dax_expression))
-        return dax_expressions
+                        yield (label, dax_expression)
 
     def get_measure_dependencies(self, measure_name: str) -> Set[str]:
         """Get direct dependencies for a measure"""
@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Optional, Set
+from .data_processor import FIELD_COLUMNS, DataProcessor
+from .model_lineage import ModelLineage, expression_text
+from .model_schema import decode_model
+
+# Relative VertiPaq cost per data type; strings pay for their dictionary
+DATA_TYPE_COSTS = {
+    'string': 10.0,
+    'binary': 8.0,
+    'double': 6.0,
+    'decimal': 4.0,
+    'dateTime': 4.0,
+    'int64': 3.0,
+    'boolean': 1.0,
+}
+DEFAULT_DATA_TYPE_COST = 5.0
+# Calculated columns compress worse than imported ones and are computed at refresh
+COLUMN_TYPE_FACTORS = {
+    'data': 1.0,
+    'calculated': 1.5,
+    'calculatedTableColumn': 1.2,
+}
+# Internal columns that cannot be removed
+SKIPPED_COLUMN_TYPES = {'rowNumber'}
+
+
+class MemoryAdvisor:
+    """Finds columns nothing references and ranks them by estimated cost.
+
+    Every referenced column key is collected into one set (from measure,
+    calculated column, calculated table and RLS expressions, relationships,
+    sort-by columns, hierarchy levels and report fields/filters), then a
+    single pass over the model's columns checks membership, so the join is
+    linear in the number of columns and references.
+    """
+
+    def __init__(self):
+        self.lineage = ModelLineage()
+        self.referenced: Set[str] = set()
+        self.candidates: List[Dict[str, Any]] = []
+
+    def process(self, model_content: Any, report_content: Optional[str] = None) -> None:
+        model = decode_model(model_content)
+        if model is None:
+            return
+        self.lineage.process_model_data(model)
+
+        # Measure and calculated column references are the lineage graph's edges
+        for source, _, _ in self.lineage.graph.iter_edges():
+            self.referenced.add(source)
+
+        for relationship in model.relationships:
+            self.referenced.add(f"{relationship.from_table}[{relationship.from_column}]")
+            self.referenced.add(f"{relationship.to_table}[{relationship.to_column}]")
+
+        for table in model.tables:
+            table_name = table.name
+            for column in table.columns:
+                if column.sort_by_column:
+                    self.referenced.add(f"{table_name}[{column.sort_by_column}]")
+            for hierarchy in table.hierarchies:
+                for level in hierarchy.levels:
+                    if level.column:
+                        self.referenced.add(f"{table_name}[{level.column}]")
+            # Calculated tables are defined by the DAX of a 'calculated' partition
+            for partition in table.partitions:
+                expression = expression_text(partition.expression) if partition.source_type == 'calculated' else ''
+                if expression:
+                    self.referenced.update(self.lineage.resolve_references(expression, table_name))
+
+        for role in model.roles:
+            for permission in role.table_permissions:
+                expression = expression_text(permission.filter_expression)
+                if expression:
+                    self.referenced.update(self.lineage.resolve_references(expression, permission.name))
+
+        if report_content:
+            processor = DataProcessor()
+            processor.process_json(report_content)
+            for row in processor.visuals_data:
+                for index in FIELD_COLUMNS:
+                    if index < len(row) and row[index]:
+                        self.referenced.update(field.strip() for field in row[index].split('; '))
+
+        self.candidates = self._rank_unreferenced()
+
+    def _rank_unreferenced(self) -> List[Dict[str, Any]]:
+        candidates = []
+        for key, column in self.lineage.columns.items():
+            if key in self.referenced or column['type'] in SKIPPED_COLUMN_TYPES:
+                continue
+            cost = (DATA_TYPE_COSTS.get(column['dataType'], DEFAULT_DATA_TYPE_COST)
+                    * COLUMN_TYPE_FACTORS.get(column['type'], 1.0))
+            candidates.append({
+                'column': key,
+                'table': column['table'],
+                'dataType': column['dataType'],
+                'type': column['type'],
+                'estimated_cost': round(cost, 2)
+            })
+        candidates.sort(key=lambda candidate: (-candidate['estimated_cost'], candidate['column']))
+        return candidates
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals for the report header."""
+        return {
+            'columns': len(self.lineage.columns),
+            'unreferenced': len(self.candidates),
+            'estimated_savings': round(sum(c['estimated_cost'] for c in self.candidates), 2),
+            'estimated_total': round(sum(
+                DATA_TYPE_COSTS.get(column['dataType'], DEFAULT_DATA_TYPE_COST)
+                * COLUMN_TYPE_FACTORS.get(column['type'], 1.0)
+                for column in self.lineage.columns.values()
+            ), 2)
+        }
@@ -0,0 +1,122 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from .lineage_graph import LineageGraph
+from .model_schema import decode_model
+
+# 'Table Name'[Name], Table[Name] or a bare [Name]
+DAX_REFERENCE_PATTERN = re.compile(r"(?:'((?:[^']|'')+)'|([A-Za-z_][\w]*))?\[([^\]]+)\]")
+# Comments and string literals, which may contain brackets that are not references
+DAX_NOISE_PATTERN = re.compile(r'//[^\n]*|--[^\n]*|/\*.*?\*/|"(?:[^"]|"")*"', re.DOTALL)
+
+
+def expression_text(expression: Any) -> str:
+    """Returns a model expression as text; .bim files may store it as a list of lines."""
+    if isinstance(expression, list):
+        return '\n'.join(expression)
+    return expression or ''
+
+
+def strip_dax_noise(expression: str) -> str:
+    """Removes comments and string literals from a DAX expression."""
+    return DAX_NOISE_PATTERN.sub(lambda match: '""' if match.group(0).startswith('"') else ' ', expression)
+
+
+def iter_dax_references(expression: str) -> Iterator[Tuple[str, str]]:
+    """Yields (table, name) for each reference in a DAX expression. The table
+    is empty for unqualified references such as [Measure]."""
+    for match in DAX_REFERENCE_PATTERN.finditer(strip_dax_noise(expression)):
+        table = match.group(1).replace("''", "'") if match.group(1) else (match.group(2) or '')
+        yield table, match.group(3)
+
+
+class ModelLineage:
+    """Resolved lineage graph of a tabular model.
+
+    Unlike ``LineageView.process_model_data``, references are resolved to
+    fully qualified ``Table[Name]`` keys, so columns and measures share one
+    namespace with the report's field references. Edges point from the
+    referenced object to the object that uses it (the direction of impact).
+    """
+
+    def __init__(self):
+        self.graph = LineageGraph()
+        self.columns: Dict[str, Dict[str, str]] = {}
+        self.measures: Dict[str, Dict[str, str]] = {}
+        self.measure_keys: Dict[str, str] = {}
+        # Column name -> key, or None when several tables share the name
+        self.column_keys: Dict[str, Optional[str]] = {}
+
+    def process_model_data(self, model_data: Any) -> None:
+        """Registers every column and measure, then resolves the references
+        in measure and calculated column expressions. Accepts JSON text, a
+        parsed dict or a decoded Model."""
+        model = decode_model(model_data)
+        if model is None:
+            return
+
+        expressions: List[Tuple[str, str, str]] = []
+        for table in model.tables:
+            table_name = table.name
+            for column in table.columns:
+                key = f"{table_name}[{column.name}]"
+                expression = expression_text(column.expression)
+                self.columns[key] = {
+                    'table': table_name,
+                    'name': column.name,
+                    'dataType': column.data_type,
+                    'type': column.type,
+                    'expression': expression
+                }
+                self.graph.add_node(key, type='column', dax=expression or None)
+                name = column.name
+                self.column_keys[name] = key if name not in self.column_keys else None
+                if expression:
+                    expressions.append((key, table_name, expression))
+            for measure in table.measures:
+                key = f"{table_name}[{measure.name}]"
+                expression = expression_text(measure.expression)
+                self.measures[key] = {
+                    'table': table_name,
+                    'name': measure.name,
+                    'expression': expression
+                }
+                self.measure_keys.setdefault(measure.name, key)
+                self.graph.add_node(key, type='measure', dax=expression)
+                if expression:
+                    expressions.append((key, table_name, expression))
+
+        for key, table_name, expression in expressions:
+            for referenced in self.resolve_references(expression, table_name):
+                if referenced != key:
+                    self.graph.add_edge(referenced, key)
+
+    def resolve_reference(self, table: str, name: str, home_table: str = '') -> Optional[str]:
+        """Resolves one reference to a column or measure key, or None."""
+        if table:
+            key = f"{table}[{name}]"
+            if key in self.columns or key in self.measures:
+                return key
+            return None
+        if name in self.measure_keys:
+            return self.measure_keys[name]
+        key = f"{home_table}[{name}]"
+        if key in self.columns:
+            return key
+        # Unqualified columns inside iterators usually belong to another table
+        return self.column_keys.get(name)
+
+    def resolve_references(self, expression: str, home_table: str = '') -> Set[str]:
+        """Returns the set of column and measure keys an expression references."""
+        resolved = set()
+        for table, name in iter_dax_references(expression):
+            key = self.resolve_reference(table, name, home_table)
+            if key:
+                resolved.add(key)
+        return resolved
+
+    def dependencies(self, key: str) -> List[str]:
+        """Returns the keys an object directly depends on."""
+        index = self.graph.index_of(key)
+        if index is None:
+            return []
+        return [self.graph.node_id(i) for i in self.graph.predecessors(index)]
@@ -0,0 +1,195 @@
+import json
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library decoder is the fallback
+    orjson = None
+
+# A JSON key, or a path of keys into nested objects
+KeyPath = Union[str, Tuple[str, ...]]
+
+
+def loads(content: Union[str, bytes]) -> Any:
+    """Parses JSON with orjson when installed. Both raise a subclass of
+    json.JSONDecodeError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def backend() -> str:
+    return 'orjson' if orjson is not None else 'json'
+
+
+class Record:
+    """Base for compact model records.
+
+    Subclasses declare FIELDS (attribute -> (JSON key path, default)) and
+    CHILDREN (attribute -> (JSON key, record type) for lists of nested
+    records), and set ``__slots__`` to their attribute names. Decoding
+    reads only the declared keys; everything else in the source object
+    (annotations, lineage tags, format strings, ...) is never copied and
+    is freed with the parsed JSON.
+    """
+
+    __slots__ = ()
+    FIELDS: Dict[str, Tuple[KeyPath, Any]] = {}
+    CHILDREN: Dict[str, Tuple[str, type]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Flattened once per class, so decoding does no per-object dict lookups on the schema
+        cls._keys = tuple((attribute, key, default) for attribute, (key, default) in cls.FIELDS.items()
+                          if not isinstance(key, tuple))
+        cls._paths = tuple((attribute, key, default) for attribute, (key, default) in cls.FIELDS.items()
+                           if isinstance(key, tuple))
+        cls._children = tuple((attribute, key, child) for attribute, (key, child) in cls.CHILDREN.items())
+
+    @classmethod
+    def decode(cls, obj: Dict[str, Any]) -> 'Record':
+        record = cls.__new__(cls)
+        get = obj.get
+        for attribute, key, default in cls._keys:
+            setattr(record, attribute, get(key, default))
+        for attribute, path, default in cls._paths:
+            value = obj
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            setattr(record, attribute, default if value is None else value)
+        for attribute, key, child in cls._children:
+            decode = child.decode
+            setattr(record, attribute, [decode(item) for item in get(key) or ()])
+        return record
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+# Expressions are kept as stored: a string, or a list of lines in .bim
+# files; use model_lineage.expression_text to read them
+
+class Column(Record):
+    FIELDS = {
+        'name': ('name', ''),
+        'data_type': ('dataType', ''),
+        'type': ('type', 'data'),
+        'source_column': ('sourceColumn', ''),
+        'expression': ('expression', None),
+        'sort_by_column': ('sortByColumn', None),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Measure(Record):
+    FIELDS = {
+        'name': ('name', ''),
+        'expression': ('expression', ''),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Partition(Record):
+    FIELDS = {
+        'name': ('name', ''),
+        'source_type': (('source', 'type'), ''),
+        'expression': (('source', 'expression'), None),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Level(Record):
+    FIELDS = {
+        'name': ('name', ''),
+        'column': ('column', None),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Hierarchy(Record):
+    FIELDS = {
+        'name': ('name', ''),
+    }
+    CHILDREN = {
+        'levels': ('levels', Level),
+    }
+    __slots__ = tuple(FIELDS) + tuple(CHILDREN)
+
+
+class Table(Record):
+    FIELDS = {
+        'name': ('name', ''),
+    }
+    CHILDREN = {
+        'columns': ('columns', Column),
+        'measures': ('measures', Measure),
+        'partitions': ('partitions', Partition),
+        'hierarchies': ('hierarchies', Hierarchy),
+    }
+    __slots__ = tuple(FIELDS) + tuple(CHILDREN)
+
+
+class Relationship(Record):
+    # crossFilteringBehavior is None when the file leaves it out; consumers
+    # apply their own default
+    FIELDS = {
+        'from_table': ('fromTable', ''),
+        'from_column': ('fromColumn', ''),
+        'to_table': ('toTable', ''),
+        'to_column': ('toColumn', ''),
+        'cross_filtering_behavior': ('crossFilteringBehavior', None),
+        'from_cardinality': ('fromCardinality', 'many'),
+        'to_cardinality': ('toCardinality', 'one'),
+        'is_active': ('isActive', True),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Expression(Record):
+    FIELDS = {
+        'name': ('name', ''),
+        'kind': ('kind', ''),
+        'expression': ('expression', None),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class TablePermission(Record):
+    FIELDS = {
+        'name': ('name', ''),
+        'filter_expression': ('filterExpression', None),
+    }
+    __slots__ = tuple(FIELDS)
+
+
+class Role(Record):
+    FIELDS = {
+        'name': ('name', ''),
+    }
+    CHILDREN = {
+        'table_permissions': ('tablePermissions', TablePermission),
+    }
+    __slots__ = tuple(FIELDS) + tuple(CHILDREN)
+
+
+class Model(Record):
+    CHILDREN = {
+        'tables': ('tables', Table),
+        'relationships': ('relationships', Relationship),
+        'expressions': ('expressions', Expression),
+        'roles': ('roles', Role),
+    }
+    __slots__ = tuple(CHILDREN)
+
+
+def decode_model(content: Any) -> Optional[Model]:
+    """Decodes a .bim/model.json file (text, bytes or an already parsed
+    dict) into a Model, or None when it has no 'model' object. A Model is
+    returned unchanged, so callers can share one decode."""
+    if isinstance(content, Model):
+        return content
+    data = content if isinstance(content, dict) else loads(content)
+    if not isinstance(data, dict) or not isinstance(data.get('model'), dict):
+        return None
+    return Model.decode(data['model'])
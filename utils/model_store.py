@@ -0,0 +1,111 @@
+import logging
+from typing import Any, List, Optional, Tuple
+from flask import g, has_app_context
+from sqlalchemy import inspect, text
+from models import EMBEDDING_DIMENSIONS, FileEmbedding, PowerBIModel
+from .analysis_cache import content_hash
+from .database import db
+from .model_schema import loads
+
+logger = logging.getLogger(__name__)
+
+# Columns missing from tables created before uploads recorded their kind
+UPGRADE_COLUMNS = {
+    'kind': 'VARCHAR(16)',
+    'content_hash': 'VARCHAR(40)',
+}
+
+
+def classify(content: str) -> Tuple[str, Any]:
+    """Classifies uploaded content as a 'model', a 'report' or 'lineage'
+    (TSV), and returns the parsed JSON with it (None for TSV), so callers
+    that go on to decode the file parse it only once."""
+    try:
+        data = loads(content)
+    except ValueError:
+        return 'lineage', None
+    if isinstance(data, dict) and 'model' in data:
+        return 'model', data
+    return 'report', data
+
+
+def detect_file_kind(content: str) -> str:
+    return classify(content)[0]
+
+
+def upgrade_schema() -> None:
+    """Adds the kind/content_hash columns and indexes to a table created by an
+    earlier version, then classifies rows stored before they existed."""
+    inspector = inspect(db.engine)
+    table = PowerBIModel.__tablename__
+    existing = {column['name'] for column in inspector.get_columns(table)}
+    missing = [name for name in UPGRADE_COLUMNS if name not in existing]
+    with db.engine.begin() as connection:
+        for name in missing:
+            connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {UPGRADE_COLUMNS[name]}'))
+        for index in PowerBIModel.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        upgrade_embeddings(connection)
+
+    legacy = PowerBIModel.query.filter(PowerBIModel.kind.is_(None)).all()
+    for model in legacy:
+        model.kind = detect_file_kind(model.content)
+        model.content_hash = content_hash(model.content)
+    if legacy:
+        logger.info(f"Classified {len(legacy)} uploads stored before file kinds were recorded")
+        db.session.commit()
+
+
+def upgrade_embeddings(connection) -> None:
+    """Converts a PostgreSQL embedding column created as JSON (when pgvector
+    was not installed) to the vector type once the extension is enabled."""
+    if not getattr(connection.dialect, 'has_pgvector', False):
+        return
+    table = FileEmbedding.__tablename__
+    data_type = connection.execute(text(
+        'SELECT data_type FROM information_schema.columns '
+        'WHERE table_name = :table AND column_name = :column'
+    ), {'table': table, 'column': 'embedding'}).scalar()
+    if data_type in ('json', 'jsonb'):
+        connection.execute(text(
+            f'ALTER TABLE {table} ALTER COLUMN embedding '
+            f'TYPE VECTOR({EMBEDDING_DIMENSIONS}) USING embedding::text::vector'
+        ))
+        logger.info(f"Converted {table}.embedding from {data_type} to vector")
+
+
+def latest(kind: str) -> Optional[PowerBIModel]:
+    """The most recent upload of ``kind``, or None.
+
+    Served by the (kind, created_at) index, without reading ``content``;
+    the result is memoized for the rest of the request.
+    """
+    cache = g.setdefault('latest_uploads', {}) if has_app_context() else {}
+    if kind not in cache:
+        cache[kind] = (PowerBIModel.query
+                       .filter_by(kind=kind)
+                       .order_by(PowerBIModel.created_at.desc(), PowerBIModel.id.desc())
+                       .first())
+    return cache[kind]
+
+
+def model_ids(kind: str) -> List[int]:
+    return [row_id for (row_id,) in db.session.query(PowerBIModel.id).filter_by(kind=kind)]
+
+
+def get(model_id: int) -> Optional[PowerBIModel]:
+    return db.session.get(PowerBIModel, model_id)
+
+
+def replace(name: str, content: str, kind: str) -> Tuple[PowerBIModel, List[int]]:
+    """Stores an upload, deleting earlier uploads with the same name and kind.
+    Returns the new row and the ids of the rows it replaced."""
+    replaced = [row_id for (row_id,) in
+                db.session.query(PowerBIModel.id).filter_by(name=name, kind=kind)]
+    if replaced:
+        PowerBIModel.query.filter(PowerBIModel.id.in_(replaced)).delete(synchronize_session=False)
+    model = PowerBIModel(name=name, kind=kind, content=content, content_hash=content_hash(content))
+    db.session.add(model)
+    db.session.commit()
+    g.pop('latest_uploads', None)
+    return model, replaced
@@ -1,17 +1,28 @@
 import os
 from typing import Dict, List, Optional
 from datetime import datetime
-from models import PowerBIModel, Query, FileEmbedding
+from models import Query, FileEmbedding
 from utils.database import db
+from utils import model_store
 from utils.powerbi_parser import DataProcessor
 import json
-import openai
-import numpy as np
+
+_openai = None
+
+def get_openai():
+    """Imports the OpenAI client on first use, so importing this module
+    (and starting the app) does not pay for the NLP stack. Requires the
+    optional ``nlp`` extra."""
+    global _openai
+    if _openai is None:
+        import openai
+        openai.api_key = os.getenv('OPENAI_API_KEY')
+        _openai = openai
+    return _openai
 
 def generate_embeddings(text: str) -> List[float]:
     """Generate embeddings using OpenAI"""
-    openai.api_key = os.getenv('OPENAI_API_KEY')
-    response = openai.embeddings.create(
+    response = get_openai().embeddings.create(
         model="text-embedding-ada-002",
         input=text
     )
@@ -118,7 +129,7 @@ def get_completion(query: str, context: List[str]) -> str:
         {"role": "user", "content": f"Context:\n{chr(10).join(context)}\n\nQuery: {query}"}
     ]
     
-    response = openai.chat.completions.create(
+    response = get_openai().chat.completions.create(
         model="gpt-3.5-turbo",
         messages=messages,
         temperature=0
@@ -129,7 +140,7 @@ def process_query(query_text: str) -> Dict:
     """Process natural language query against the Power BI model structure"""
     try:
         # Get the latest PowerBI model
-        latest_model = PowerBIModel.query.order_by(PowerBIModel.created_at.desc()).first()
+        latest_model = model_store.latest('model')
         if not latest_model:
             return {
                 'type': 'error',
@@ -1,6 +1,8 @@
 import json
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+from .model_lineage import expression_text
+from .model_schema import decode_model
 
 logger = logging.getLogger(__name__)
 
@@ -8,43 +10,43 @@ class PowerBIParser:
     def __init__(self):
         self.m_queries = []
 
-    def extract_m_queries(self, content: str) -> List[Dict[str, str]]:
+    def extract_m_queries(self, content: Any) -> List[Dict[str, str]]:
         """Extract M queries from model data"""
+        self.m_queries.extend(self.iter_m_queries(content))
+        return self.m_queries
+
+    def iter_m_queries(self, content: Any) -> Iterator[Dict[str, str]]:
+        """Yield M queries from model data (JSON text or a decoded Model) one at a time"""
         try:
-            data = json.loads(content)
-            if 'model' not in data:
-                return []
-
-            for table in data['model'].get('tables', []):
-                for partition in table.get('partitions', []):
-                    source = partition.get('source', {})
-                    if source.get('type') == 'm':
-                        m_query = '\n'.join(source.get('expression', []))
+            model = decode_model(content)
+            if model is None:
+                return
+
+            for table in model.tables:
+                for partition in table.partitions:
+                    if partition.source_type == 'm':
+                        m_query = expression_text(partition.expression)
                         if m_query.strip().lower().startswith('let'):
-                            self.m_queries.append({
-                                'table_name': table['name'],
+                            yield {
+                                'table_name': table.name,
                                 'query': m_query,
                                 'type': 'table_source'
-                            })
+                            }
 
             # Extract M expressions
-            for expression in data['model'].get('expressions', []):
-                if expression.get('kind') == 'm':
-                    m_query = '\n'.join(expression.get('expression', []))
+            for expression in model.expressions:
+                if expression.kind == 'm':
+                    m_query = expression_text(expression.expression)
                     if m_query.strip().lower().startswith('let'):
-                        self.m_queries.append({
-                            'name': expression['name'],
+                        yield {
+                            'name': expression.name,
                             'query': m_query,
                             'type': 'expression'
-                        })
-
-            return self.m_queries
+                        }
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing JSON content: {e}")
-            return []
         except Exception as e:
             logger.error(f"Unexpected error processing model data: {e}")
-            return []
 
 import json
 import re
@@ -71,7 +73,7 @@ class DataProcessor:
         and M queries
         """
         try:
-            data = json.loads(content)
+            decoded = decode_model(content)
             model = {
                 'tables': [],
                 'relationships': [],
@@ -79,49 +81,47 @@ class DataProcessor:
                 'm_queries': []
             }
             
-            if 'model' in data:
+            if decoded is not None:
                 # Extract tables with enhanced metadata
-                if 'tables' in data['model']:
-                    model['tables'] = [
-                        {
-                            'name': table.get('name', ''),
-                            'columns': [
-                                {
-                                    'name': col.get('name', ''),
-                                    'dataType': col.get('dataType', ''),
-                                    'sourceColumn': col.get('sourceColumn', '')
-                                }
-                                for col in table.get('columns', [])
-                            ],
-                            'measures': [
-                                {
-                                    'name': measure.get('name', ''),
-                                    'expression': measure.get('expression', '')
-                                }
-                                for measure in table.get('measures', [])
-                            ]
-                        }
-                        for table in data['model']['tables']
-                    ]
+                model['tables'] = [
+                    {
+                        'name': table.name,
+                        'columns': [
+                            {
+                                'name': col.name,
+                                'dataType': col.data_type,
+                                'sourceColumn': col.source_column
+                            }
+                            for col in table.columns
+                        ],
+                        'measures': [
+                            {
+                                'name': measure.name,
+                                'expression': measure.expression
+                            }
+                            for measure in table.measures
+                        ]
+                    }
+                    for table in decoded.tables
+                ]
                 
                 # Extract relationships with additional metadata
-                if 'relationships' in data['model']:
-                    model['relationships'] = [
-                        {
-                            'fromTable': rel.get('fromTable', ''),
-                            'fromColumn': rel.get('fromColumn', ''),
-                            'toTable': rel.get('toTable', ''),
-                            'toColumn': rel.get('toColumn', ''),
-                            'crossFilteringBehavior': rel.get('crossFilteringBehavior', 'automatic')
-                        }
-                        for rel in data['model']['relationships']
-                    ]
+                model['relationships'] = [
+                    {
+                        'fromTable': rel.from_table,
+                        'fromColumn': rel.from_column,
+                        'toTable': rel.to_table,
+                        'toColumn': rel.to_column,
+                        'crossFilteringBehavior': rel.cross_filtering_behavior or 'automatic'
+                    }
+                    for rel in decoded.relationships
+                ]
 
                 # Process model data for lineage tracking
-                self.lineage_view.process_model_data(data)
+                self.lineage_view.process_model_data(decoded)
                 
-                # Extract M queries using the new parser
-                model['m_queries'] = self.powerbi_parser.extract_m_queries(content)
+                # Extract M queries from the same decoded model
+                model['m_queries'] = self.powerbi_parser.extract_m_queries(decoded)
 
             return model
         except Exception as e:
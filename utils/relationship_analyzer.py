@@ -0,0 +1,187 @@
+from typing import Any, Dict, List, Optional
+from .lineage_graph import LineageGraph
+from .model_schema import decode_model
+
+MAX_PATH_LENGTH = 6
+MAX_PATHS_PER_SOURCE = 2000
+MAX_REPORTED_PATHS = 500
+
+
+class RelationshipAnalyzer:
+    """Analyses how filters propagate through a model's relationships.
+
+    Active relationships become edges of a table graph in the direction
+    filters flow: from the one side to the many side, plus the reverse for
+    bidirectional cross-filtering and for one-to-one relationships, which
+    always filter both ways. On that graph:
+
+    - strongly connected components with more than one table are chains of
+      bidirectional filters;
+    - a pair of tables joined by two or more distinct filter paths is an
+      ambiguous path, found by bounded path enumeration;
+    - snowflake depth is the longest many-to-one chain out of each table,
+      over a separate graph of many-to-one relationships only;
+    - many-to-many relationships are counted along every reported path.
+    """
+
+    def __init__(self, max_path_length: int = MAX_PATH_LENGTH,
+                 max_paths_per_source: int = MAX_PATHS_PER_SOURCE):
+        self.max_path_length = max_path_length
+        self.max_paths_per_source = max_paths_per_source
+        self.filter_graph = LineageGraph()
+        self.lookup_graph = LineageGraph()
+        self.relationships: List[Dict[str, Any]] = []
+        self._many_to_many: set = set()
+
+    def process_model_data(self, model_data: Any) -> None:
+        model = decode_model(model_data)
+        if model is None:
+            return
+        for table in model.tables:
+            self.filter_graph.add_node(table.name, type='table')
+            self.lookup_graph.add_node(table.name, type='table')
+
+        for relationship in model.relationships:
+            record = {
+                'fromTable': relationship.from_table,
+                'fromColumn': relationship.from_column,
+                'toTable': relationship.to_table,
+                'toColumn': relationship.to_column,
+                'crossFilteringBehavior': relationship.cross_filtering_behavior or 'oneDirection',
+                'fromCardinality': relationship.from_cardinality,
+                'toCardinality': relationship.to_cardinality,
+                'isActive': relationship.is_active is not False
+            }
+            self.relationships.append(record)
+            if not record['isActive']:
+                continue
+            cardinality = (record['fromCardinality'], record['toCardinality'])
+            if cardinality == ('many', 'many'):
+                self._many_to_many.add(frozenset((record['fromTable'], record['toTable'])))
+            # Filters flow from the one side to the many side
+            self.filter_graph.add_edge(record['toTable'], record['fromTable'])
+            if record['crossFilteringBehavior'] == 'bothDirections' or cardinality == ('one', 'one'):
+                self.filter_graph.add_edge(record['fromTable'], record['toTable'])
+            if cardinality == ('many', 'one'):
+                self.lookup_graph.add_edge(record['fromTable'], record['toTable'])
+
+    def bidirectional_relationships(self) -> List[Dict[str, Any]]:
+        return [r for r in self.relationships
+                if r['isActive'] and r['crossFilteringBehavior'] == 'bothDirections']
+
+    def many_to_many_relationships(self) -> List[Dict[str, Any]]:
+        return [r for r in self.relationships
+                if r['isActive'] and r['fromCardinality'] == 'many' and r['toCardinality'] == 'many']
+
+    def bidirectional_chains(self) -> List[List[str]]:
+        """Groups of tables that filter each other, i.e. the non-trivial
+        strongly connected components of the filter graph."""
+        component, count = self.filter_graph.strongly_connected_components()
+        members: List[List[str]] = [[] for _ in range(count)]
+        for node, label in enumerate(component):
+            members[label].append(self.filter_graph.node_id(node))
+        return sorted((sorted(group) for group in members if len(group) > 1), key=len, reverse=True)
+
+    def _enumerate_paths(self, source: int) -> Dict[int, List[List[int]]]:
+        """Simple paths from ``source`` up to max_path_length edges, keeping
+        at most two per target and at most max_paths_per_source overall."""
+        graph = self.filter_graph
+        found: Dict[int, List[List[int]]] = {}
+        budget = self.max_paths_per_source
+        path = [source]
+        on_path = {source}
+        stack = [iter(graph.successors(source))]
+        while stack and budget > 0:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if child in on_path:
+                continue
+            budget -= 1
+            paths = found.setdefault(child, [])
+            if len(paths) < 2:
+                paths.append(path + [child])
+            if len(path) < self.max_path_length:
+                path.append(child)
+                on_path.add(child)
+                stack.append(iter(graph.successors(child)))
+        return found
+
+    def ambiguous_paths(self) -> List[Dict[str, Any]]:
+        """Table pairs that a filter can reach through more than one path,
+        with up to two example paths each."""
+        graph = self.filter_graph
+        results = []
+        for source in range(len(graph)):
+            if graph.out_degree(source) == 0:
+                continue
+            for target, paths in self._enumerate_paths(source).items():
+                if len(paths) < 2 or target == source:
+                    continue
+                named = [[graph.node_id(node) for node in p] for p in paths]
+                results.append({
+                    'from': graph.node_id(source),
+                    'to': graph.node_id(target),
+                    'paths': named,
+                    'many_to_many_hops': max(self._many_to_many_hops(p) for p in named)
+                })
+        return results
+
+    def _many_to_many_hops(self, path: List[str]) -> int:
+        return sum(1 for a, b in zip(path, path[1:]) if frozenset((a, b)) in self._many_to_many)
+
+    def snowflake_depths(self) -> List[Dict[str, Any]]:
+        """Longest many-to-one chain starting at each table, deepest first.
+
+        Computed over the SCC condensation of the lookup graph, so a
+        (malformed) cycle of lookups is counted once instead of looping.
+        """
+        graph = self.lookup_graph
+        component, count = graph.strongly_connected_components()
+        members: List[List[int]] = [[] for _ in range(count)]
+        for node, label in enumerate(component):
+            members[label].append(node)
+        # Successor components have lower numbers, so ascending order
+        # finishes every lookup target before the tables pointing at it
+        depth = [0] * count
+        next_hop: List[Optional[int]] = [None] * count
+        for label in range(count):
+            for node in members[label]:
+                for child in graph.successors(node):
+                    child_label = component[child]
+                    if child_label != label and depth[child_label] + 1 > depth[label]:
+                        depth[label] = depth[child_label] + 1
+                        next_hop[label] = child
+        results = []
+        for node in range(len(graph)):
+            label = component[node]
+            if depth[label] < 2 or graph.in_degree(node) > 0:
+                continue
+            chain = [graph.node_id(node)]
+            hop = next_hop[label]
+            while hop is not None:
+                chain.append(graph.node_id(hop))
+                hop = next_hop[component[hop]]
+            results.append({'table': graph.node_id(node), 'depth': depth[label], 'chain': chain})
+        return sorted(results, key=lambda result: (-result['depth'], result['table']))
+
+    def analyze(self) -> Dict[str, Any]:
+        """Runs every analysis and returns one JSON-serializable result.
+        Ambiguous paths are reported longest-chain first and capped at
+        MAX_REPORTED_PATHS; the full count is in ambiguous_path_count."""
+        ambiguous = sorted(
+            self.ambiguous_paths(),
+            key=lambda result: (-result['many_to_many_hops'], -max(len(p) for p in result['paths']))
+        )
+        return {
+            'tables': len(self.filter_graph),
+            'relationships': len(self.relationships),
+            'bidirectional': self.bidirectional_relationships(),
+            'bidirectional_chains': self.bidirectional_chains(),
+            'ambiguous_path_count': len(ambiguous),
+            'ambiguous_paths': ambiguous[:MAX_REPORTED_PATHS],
+            'snowflakes': self.snowflake_depths(),
+            'many_to_many': self.many_to_many_relationships()
+        }
@@ -0,0 +1,223 @@
+from collections import deque
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+from .data_processor import DataProcessor
+from .model_lineage import ModelLineage
+from .model_schema import decode_model
+
+DEFAULT_BUDGETS = {
+    'queries_per_page': 15,
+    'fields_per_query': 12,
+    'relationships_per_query': 3,
+}
+# Visual types that render without sending a query to the model
+STATIC_VISUAL_TYPES = {
+    'textbox', 'image', 'shape', 'basicShape', 'actionButton',
+    'pageNavigator', 'bookmarkNavigator',
+}
+
+
+class ReportAuditor:
+    """Estimates the query load of every report page in one pass.
+
+    Each visual with a prototype query is counted as one query touching
+    its selected fields, its own filters and the page- and report-level
+    filters. A measure touches the tables whose columns its DAX reads,
+    directly or through other measures, rather than the table it is
+    stored on. The relationships a query crosses are estimated from the
+    model's active relationships as the edges needed to connect all the
+    tables it touches; without a model, as the number of tables minus one.
+    """
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, model_data: Any = None):
+        self.budgets = dict(DEFAULT_BUDGETS)
+        self.budgets.update(budgets or {})
+        self.processor = DataProcessor()
+        self.lineage: Optional[ModelLineage] = None
+        self._adjacency: Optional[Dict[str, List[str]]] = None
+        self._measure_tables: Dict[str, Set[str]] = {}
+        self._crossed: Dict[FrozenSet[str], int] = {}
+        if model_data:
+            self._load_relationships(model_data)
+
+    def _load_relationships(self, model_data: Any) -> None:
+        model = decode_model(model_data)
+        adjacency: Dict[str, Set[str]] = {}
+        if model is not None:
+            self.lineage = ModelLineage()
+            self.lineage.process_model_data(model)
+            for relationship in model.relationships:
+                if relationship.is_active is False:
+                    continue
+                from_table = relationship.from_table
+                to_table = relationship.to_table
+                adjacency.setdefault(from_table, set()).add(to_table)
+                adjacency.setdefault(to_table, set()).add(from_table)
+        # Sorted, so ties between equally short paths break the same way every run
+        self._adjacency = {table: sorted(neighbours) for table, neighbours in adjacency.items()}
+
+    def tables_of_measure(self, measure: str) -> Set[str]:
+        """Tables whose columns a measure reads, following references to
+        other measures; its own table when the DAX reads no known column."""
+        if measure not in self._measure_tables:
+            tables: Set[str] = set()
+            graph = self.lineage.graph if self.lineage else None
+            index = graph.index_of(measure) if graph else None
+            if index is not None:
+                seen = {index}
+                stack = [index]
+                while stack:
+                    for source in graph.predecessors(stack.pop()):
+                        if source in seen:
+                            continue
+                        seen.add(source)
+                        key = graph.node_id(source)
+                        if key in self.lineage.columns:
+                            # A calculated column is stored, so its own inputs are not queried
+                            tables.add(self.lineage.columns[key]['table'])
+                        else:
+                            stack.append(source)
+            self._measure_tables[measure] = tables or {self._table_of(measure)}
+        return self._measure_tables[measure]
+
+    def tables_touched(self, measures: Iterable[str], columns: Iterable[str]) -> Set[str]:
+        tables = {self._table_of(column) for column in columns}
+        for measure in measures:
+            tables.update(self.tables_of_measure(measure))
+        return tables
+
+    def relationships_crossed(self, tables: Iterable[str]) -> int:
+        """Number of relationships joining ``tables``.
+
+        Tables without relationships (measure tables, disconnected helpers)
+        join nothing and are left out. The rest are connected by growing a
+        tree from one of them, repeatedly adding the shortest path to the
+        nearest table not yet in it; a union of shortest paths that is at
+        most twice the minimum (Steiner) tree. Tables in separate components
+        are connected within their own component.
+        """
+        tables = set(tables)
+        if len(tables) < 2:
+            return 0
+        if self._adjacency is None:
+            return len(tables) - 1
+        key = frozenset(table for table in tables if table in self._adjacency)
+        if key not in self._crossed:
+            self._crossed[key] = self._spanning_edges(key)
+        return self._crossed[key]
+
+    def _spanning_edges(self, terminals: FrozenSet[str]) -> int:
+        remaining = set(terminals)
+        edges = 0
+        while remaining:
+            root = min(remaining)
+            remaining.discard(root)
+            tree = {root}
+            while remaining:
+                path = self._shortest_path_to(tree, remaining)
+                if path is None:
+                    break
+                tree.update(path)
+                remaining.difference_update(path)
+                edges += len(path)
+        return edges
+
+    def _shortest_path_to(self, tree: Set[str], targets: Set[str]) -> Optional[List[str]]:
+        """The tables outside ``tree`` on a shortest path from it to the
+        nearest of ``targets``, or None when no target is reachable."""
+        parents: Dict[str, Optional[str]] = {table: None for table in tree}
+        queue = deque(sorted(tree))
+        while queue:
+            table = queue.popleft()
+            for neighbour in self._adjacency.get(table, ()):
+                if neighbour in parents:
+                    continue
+                parents[neighbour] = table
+                if neighbour in targets:
+                    path = []
+                    node: Optional[str] = neighbour
+                    while node not in tree:
+                        path.append(node)
+                        node = parents[node]
+                    return path
+                queue.append(neighbour)
+        return None
+
+    @staticmethod
+    def _table_of(field: str) -> str:
+        return field.split('[', 1)[0]
+
+    def audit(self, report_content: Any) -> List[Dict[str, Any]]:
+        """Returns one result per page, with per-visual query estimates and
+        the budgets each page exceeds."""
+        data = self.processor.safe_json_loads(report_content)
+        if not isinstance(data, dict):
+            return []
+        report_filters = self.processor.extract_filter_refs(
+            self.processor.safe_json_loads(data.get('filters', '[]')) or []
+        )
+
+        pages = []
+        for section in data.get('sections', []):
+            page_filters = report_filters + self.processor.extract_filter_refs(
+                self.processor.safe_json_loads(section.get('filters', '[]')) or []
+            )
+            page = {
+                'page': section.get('displayName', ''),
+                'visuals': 0,
+                'queries': 0,
+                'measures': set(),
+                'columns': set(),
+                'max_fields_per_query': 0,
+                'max_relationships_per_query': 0,
+                'queries_detail': [],
+                'violations': []
+            }
+            for visual in section.get('visualContainers', []):
+                page['visuals'] += 1
+                fields = self.processor.extract_visual_fields(visual)
+                if (fields is None or not fields['has_query']
+                        or fields['visual_type'] in STATIC_VISUAL_TYPES):
+                    continue
+                measures = {field for field, kind in fields['select'] if kind == 'Measure'}
+                columns = {field for field, kind in fields['select'] if kind != 'Measure'}
+                columns.update(fields['filters'])
+                columns.update(page_filters)
+                tables = self.tables_touched(measures, columns)
+                relationships = self.relationships_crossed(tables)
+
+                page['queries'] += 1
+                page['measures'].update(measures)
+                page['columns'].update(columns)
+                page['max_fields_per_query'] = max(page['max_fields_per_query'], len(measures) + len(columns))
+                page['max_relationships_per_query'] = max(page['max_relationships_per_query'], relationships)
+                page['queries_detail'].append({
+                    'visual': fields['visual_name'],
+                    'type': fields['visual_type'],
+                    'measures': len(measures),
+                    'columns': len(columns),
+                    'relationships': relationships
+                })
+
+            page['violations'] = self._violations(page)
+            page['measures'] = len(page['measures'])
+            page['columns'] = len(page['columns'])
+            pages.append(page)
+        return pages
+
+    def _violations(self, page: Dict[str, Any]) -> List[str]:
+        violations = []
+        if page['queries'] > self.budgets['queries_per_page']:
+            violations.append(
+                f"{page['queries']} visual queries (budget {self.budgets['queries_per_page']})"
+            )
+        if page['max_fields_per_query'] > self.budgets['fields_per_query']:
+            violations.append(
+                f"A query touches {page['max_fields_per_query']} fields "
+                f"(budget {self.budgets['fields_per_query']})"
+            )
+        if page['max_relationships_per_query'] > self.budgets['relationships_per_query']:
+            violations.append(
+                f"A query crosses {page['max_relationships_per_query']} relationships "
+                f"(budget {self.budgets['relationships_per_query']})"
+            )
+        return violations
@@ -0,0 +1,252 @@
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from .data_processor import DataProcessor
+from .model_lineage import DAX_REFERENCE_PATTERN, ModelLineage
+from .model_schema import decode_model
+from .powerbi_parser import PowerBIParser
+
+WORD_PATTERN = re.compile(r'\w+')
+SNIPPET_RADIUS = 60
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+def reference_token(table: str, name: str) -> str:
+    """Normalized token for a Table[Column] / Table[Measure] reference."""
+    return f"{table.lower()}[{name.lower()}]"
+
+
+def split_field(field: str) -> Optional[Tuple[str, str]]:
+    """Splits a ``Table[Name]`` key or report field into (table, name).
+    These are written without DAX quoting, so the table may contain
+    spaces and cannot be found with DAX_REFERENCE_PATTERN."""
+    table, bracket, rest = field.partition('[')
+    if table and bracket and rest.endswith(']'):
+        return table, rest[:-1]
+    return None
+
+
+def tokenize(text: str, references: Optional[Iterable[Tuple[str, str]]] = None) -> List[str]:
+    """Splits text into lowercase word tokens plus one token per qualified
+    ``Table[Column]`` reference, so references can be matched as a unit.
+    References are parsed from the text as DAX unless given as (table,
+    name) pairs."""
+    tokens = WORD_PATTERN.findall(text.lower())
+    if references is not None:
+        tokens.extend(reference_token(table, name) for table, name in references)
+        return tokens
+    for match in DAX_REFERENCE_PATTERN.finditer(text):
+        table = match.group(1) or match.group(2)
+        if table:
+            tokens.append(reference_token(table.replace("''", "'"), match.group(3)))
+    return tokens
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchDocument:
+    __slots__ = ('kind', 'key', 'title', 'text', 'lowered')
+
+    def __init__(self, kind: str, key: str, title: str, text: str):
+        self.kind = kind
+        self.key = key
+        self.title = title
+        self.text = text
+        self.lowered = f"{title}\n{text}".lower()
+
+
+class SearchIndex:
+    """In-memory search index over one model and its report.
+
+    Documents are DAX expressions (measures and calculated columns), M
+    queries, column names and visual field lists. Word and ``Table[Column]``
+    tokens go into an inverted index ranked with TF-IDF; a sorted vocabulary
+    answers prefix queries (``sales*``) and a trigram index narrows
+    substring queries down before they are verified against the text.
+    """
+
+    def __init__(self):
+        self.documents: List[SearchDocument] = []
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._trigrams: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+
+    def add_document(self, kind: str, key: str, title: str, text: str,
+                     title_references: Iterable[Tuple[str, str]] = (),
+                     text_references: Optional[Iterable[Tuple[str, str]]] = None) -> None:
+        """Indexes one document. The title's references are given as
+        (table, name) pairs; the text's are parsed as DAX unless given."""
+        doc_id = len(self.documents)
+        document = SearchDocument(kind, key, title, text)
+        self.documents.append(document)
+        # Titles count twice, so name matches outrank mentions in bodies
+        tokens = tokenize(title, title_references) * 2 + tokenize(text, text_references)
+        for token, count in Counter(tokens).items():
+            self._postings.setdefault(token, {})[doc_id] = count
+        for gram in trigrams(document.lowered):
+            self._trigrams.setdefault(gram, array('l')).append(doc_id)
+        self._vocabulary = []
+
+    def build(self, model_content: Any, report_content: Optional[str] = None) -> None:
+        """Indexes everything searchable in the model and report."""
+        model = decode_model(model_content) if model_content else None
+        if model:
+            lineage = ModelLineage()
+            lineage.process_model_data(model)
+            for key, measure in lineage.measures.items():
+                self.add_document('dax', key, key, measure['expression'],
+                                  [(measure['table'], measure['name'])])
+            for key, column in lineage.columns.items():
+                reference = [(column['table'], column['name'])]
+                if column['expression']:
+                    self.add_document('dax', key, key, column['expression'], reference)
+                else:
+                    self.add_document('column', key, key, column['dataType'], reference, [])
+            parser = PowerBIParser()
+            for query in parser.extract_m_queries(model):
+                name = query.get('table_name') or query.get('name', '')
+                self.add_document('m_query', name, name, query['query'])
+        if report_content:
+            processor = DataProcessor()
+            processor.process_json(report_content)
+            for row in processor.visuals_data:
+                title = ' / '.join(cell for cell in row[:3] if cell)
+                fields = '; '.join(cell for cell in row[3:] if cell)
+                references = [split_field(field) for field in fields.split('; ')]
+                self.add_document('visual', row[0], title, fields,
+                                  text_references=[reference for reference in references if reference])
+
+    def _ensure_vocabulary(self) -> List[str]:
+        if not self._vocabulary:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _idf(self, token: str) -> float:
+        return math.log(1 + len(self.documents) / (1 + len(self._postings.get(token, ()))))
+
+    def _prefix_tokens(self, prefix: str) -> Iterable[str]:
+        vocabulary = self._ensure_vocabulary()
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            yield vocabulary[position]
+            position += 1
+
+    def _token_scores(self, tokens: Iterable[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for token in tokens:
+            idf = self._idf(token)
+            for doc_id, count in self._postings.get(token, {}).items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + (1 + math.log(count)) * idf
+        return scores
+
+    def _substring_scores(self, needle: str) -> Dict[int, float]:
+        grams = sorted(trigrams(needle), key=lambda gram: len(self._trigrams.get(gram, ())))
+        if grams:
+            candidates: Set[int] = set(self._trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates.intersection_update(self._trigrams.get(gram, ()))
+        else:
+            candidates = set(range(len(self.documents)))
+        scores: Dict[int, float] = {}
+        for doc_id in candidates:
+            occurrences = self.documents[doc_id].lowered.count(needle)
+            if occurrences:
+                scores[doc_id] = 0.5 * (1 + math.log(occurrences))
+        return scores
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        """Scores one query term: a Table[Column] reference, a prefix
+        (``term*``), or a word that falls back to a substring match."""
+        reference = DAX_REFERENCE_PATTERN.fullmatch(term)
+        if reference and (reference.group(1) or reference.group(2)):
+            table = (reference.group(1) or reference.group(2)).replace("''", "'")
+            return self._token_scores([reference_token(table, reference.group(3))])
+        if term.endswith('*'):
+            return self._token_scores(self._prefix_tokens(term.rstrip('*')))
+        scores = self._substring_scores(term)
+        for doc_id, score in self._token_scores([term]).items():
+            scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return scores
+
+    def _query_terms(self, query: str) -> List[str]:
+        """Splits a query into terms. ``'Table Name'[Column]`` is one term, and
+        so is the unquoted ``Table Name[Column]`` when that reference is
+        indexed, so it matches the token fields and keys were indexed with."""
+        terms: List[str] = []
+        for term in re.findall(r"'[^']*'\[[^\]]*\]|\S+", query.lower()):
+            if not term.strip('*'):
+                continue
+            if '[' in term and not term.startswith("'"):
+                for start in range(len(terms)):
+                    candidate = ' '.join(terms[start:] + [term])
+                    if candidate in self._postings:
+                        del terms[start:]
+                        table, _, rest = candidate.partition('[')
+                        term = "'" + table.replace("'", "''") + "'[" + rest
+                        break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, kinds: Optional[Iterable[str]] = None,
+               page: int = 1, per_page: int = DEFAULT_PER_PAGE) -> Dict[str, Any]:
+        """Returns one page of ranked results; every term must match."""
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        page = max(1, page)
+        kinds = set(kinds) if kinds else None
+        terms = self._query_terms(query)
+
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            term_scores = self._term_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id]
+                          for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                break
+        scores = scores or {}
+
+        ranked = sorted(
+            (doc_id for doc_id in scores if kinds is None or self.documents[doc_id].kind in kinds),
+            key=lambda doc_id: (-scores[doc_id], doc_id)
+        )
+        start = (page - 1) * per_page
+        results = []
+        for doc_id in ranked[start:start + per_page]:
+            document = self.documents[doc_id]
+            results.append({
+                'kind': document.kind,
+                'key': document.key,
+                'title': document.title,
+                'snippet': self._snippet(document, terms),
+                'score': round(scores[doc_id], 4)
+            })
+        return {
+            'query': query,
+            'total': len(ranked),
+            'page': page,
+            'per_page': per_page,
+            'results': results
+        }
+
+    def _snippet(self, document: SearchDocument, terms: List[str]) -> str:
+        text = document.text
+        lowered = text.lower()
+        for term in terms:
+            position = lowered.find(term.rstrip('*'))
+            if position != -1:
+                start = max(0, position - SNIPPET_RADIUS)
+                end = min(len(text), position + len(term) + SNIPPET_RADIUS)
+                prefix = '...' if start > 0 else ''
+                suffix = '...' if end < len(text) else ''
+                return f"{prefix}{text[start:end]}{suffix}"
+        return text[:2 * SNIPPET_RADIUS]